@@ -3,11 +3,10 @@
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
 
-from app.config import get_settings
-
-settings = get_settings()
+from app.config import settings
 
 # Initialize bot with default properties
 bot = Bot(
@@ -18,6 +17,35 @@ bot = Bot(
     ),
 )
 
-# Initialize dispatcher with memory storage for FSM
-# For production, consider using RedisStorage
-dp = Dispatcher(storage=MemoryStorage())
+
+def create_storage() -> BaseStorage:
+    """Create FSM storage: Redis when configured, in-memory otherwise."""
+    if not settings.redis_url:
+        return MemoryStorage()
+
+    import orjson
+    from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+    from redis.asyncio import Redis
+
+    # Redis keeps FSM state across restarts and shares it between bot processes.
+    # The whole state dict (wizard text, entities, buttons) is re-encoded on
+    # every update_data, so encode it with orjson rather than stdlib json.
+    return RedisStorage(
+        redis=Redis.from_url(settings.redis_url),
+        key_builder=DefaultKeyBuilder(with_bot_id=True),
+        json_loads=orjson.loads,
+        json_dumps=lambda data: orjson.dumps(data).decode(),
+    )
+
+
+def create_events_isolation(storage: BaseStorage) -> BaseEventIsolation:
+    """Serialize updates per chat and user only, never across users."""
+    if settings.redis_url:
+        # Redis locks also cover updates of one user handled by other processes
+        return storage.create_isolation()
+    return SimpleEventIsolation()
+
+
+# Initialize dispatcher with FSM storage
+storage = create_storage()
+dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
@@ -1,10 +1,10 @@
 """Application configuration using pydantic-settings."""
 
-from functools import lru_cache
-from typing import List
+from functools import cached_property
+from typing import Annotated, Optional
 
 from pydantic import field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -19,7 +19,8 @@ class Settings(BaseSettings):
     # Bot settings
     bot_token: str
     channel_id: str | int
-    admin_ids: List[int] = []
+    # NoDecode: the env value is a comma-separated string, not JSON
+    admin_ids: Annotated[frozenset[int], NoDecode] = frozenset()
 
     # Database settings
     postgres_host: str = "localhost"
@@ -27,6 +28,26 @@ class Settings(BaseSettings):
     postgres_user: str = "botuser"
     postgres_password: str = "botpassword"
     postgres_db: str = "bot_posts"
+    # Set when connecting through PgBouncer in transaction pooling mode,
+    # which does not support server-side prepared statements
+    pgbouncer: bool = False
+
+    # Connection pool
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    # PgBouncer already pools connections, no need for a second pool
+    db_use_null_pool: bool = False
+
+    # In-process cache of posts by ID, seconds (0 disables). Only safe
+    # with a single bot process writing to the database
+    post_cache_ttl: int = 0
+    # Same for post list pages and counts; short TTLs absorb pagination bursts
+    list_cache_ttl: int = 0
+
+    # Redis URL for FSM storage; in-memory storage is used when unset
+    redis_url: Optional[str] = None
 
     # Logging
     log_level: str = "INFO"
@@ -37,9 +58,9 @@ class Settings(BaseSettings):
     @field_validator("admin_ids", mode="before")
     @classmethod
     def parse_admin_ids(cls, v):
-        """Parse comma-separated admin IDs."""
+        """Parse comma-separated admin IDs into a set for O(1) lookups."""
         if isinstance(v, str):
-            return [int(x.strip()) for x in v.split(",") if x.strip()]
+            return frozenset(int(x.strip()) for x in v.split(",") if x.strip())
         return v
 
     @field_validator("channel_id", mode="before")
@@ -52,7 +73,7 @@ class Settings(BaseSettings):
                 return int(v)
         return v
 
-    @property
+    @cached_property
     def database_url(self) -> str:
         """Build PostgreSQL connection URL for SQLAlchemy."""
         return (
@@ -60,7 +81,7 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
-    @property
+    @cached_property
     def database_url_sync(self) -> str:
         """Build synchronous PostgreSQL URL for Alembic."""
         return (
@@ -69,7 +90,9 @@ class Settings(BaseSettings):
         )
 
 
-@lru_cache
+settings = Settings()
+
+
 def get_settings() -> Settings:
-    """Get cached settings instance."""
-    return Settings()
+    """Get the application settings instance."""
+    return settings
@@ -4,7 +4,8 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, String, Text, Boolean, JSON
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, Text, Boolean, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, IDMixin, TimestampMixin
@@ -15,6 +16,7 @@ class PostStatus(str, Enum):
 
     DRAFT = "draft"
     SCHEDULED = "scheduled"
+    PUBLISHING = "publishing"
     PUBLISHED = "published"
     FAILED = "failed"
 
@@ -33,25 +35,41 @@ class DraftPost(Base, IDMixin, TimestampMixin):
     """Draft post model."""
 
     __tablename__ = "draft_posts"
+    __table_args__ = (
+        # Scheduler scan: status = 'scheduled' AND scheduled_at <= now ORDER BY scheduled_at.
+        # Also serves status-only filters via its leading column.
+        Index("ix_draft_posts_status_scheduled_at", "status", "scheduled_at"),
+        # Pending queue only: stays small no matter how many posts were published.
+        Index(
+            "ix_draft_posts_pending_sched",
+            "scheduled_at",
+            postgresql_where=text("status = 'scheduled'"),
+        ),
+        # Paged post lists: author_id = ? [AND status = ?] ORDER BY created_at DESC.
+        Index("ix_draft_posts_author_status_created", "author_id", "status", "created_at"),
+    )
 
     # Author info
-    author_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    author_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     author_username: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
     # Post content
     text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Text entities (for premium emoji and formatting)
-    text_entities: Mapped[Optional[List[dict]]] = mapped_column(JSON, nullable=True)
+    # Stored as JSONB on PostgreSQL (binary, no re-parse on read)
+    text_entities: Mapped[Optional[List[dict]]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=True
+    )
     
     # Scheduling
     scheduled_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime(timezone=True), nullable=True, index=True
+        DateTime(timezone=True), nullable=True
     )
     
     # Status
     status: Mapped[str] = mapped_column(
-        String(20), default=PostStatus.DRAFT.value, nullable=False, index=True
+        String(20), default=PostStatus.DRAFT.value, nullable=False
     )
     
     # Published message info
@@ -59,6 +77,9 @@ class DraftPost(Base, IDMixin, TimestampMixin):
     published_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Hash of the inline keyboard last sent to the channel message, so an
+    # unchanged keyboard is not re-sent
+    published_keyboard_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
 
     # Scheduler job ID
     scheduler_job_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
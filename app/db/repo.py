@@ -3,11 +3,88 @@
 from datetime import datetime
 from typing import List, Optional, Sequence, Tuple
 
-from sqlalchemy import select, update, delete
+from cachetools import TTLCache
+from sqlalchemy import delete, func, insert, lambda_stmt, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.db.models import DraftPost, DraftMedia, DraftButton, PostStatus
 
+# Eager-load post relations in one IN query each instead of lazy-loading
+# them on attribute access (which is not allowed in async code).
+_POST_RELATIONS = (
+    selectinload(DraftPost.media),
+    selectinload(DraftPost.buttons),
+)
+
+# Every column attribute of a post, for refreshing a loaded post in place
+_POST_COLUMN_KEYS = tuple(attr.key for attr in DraftPost.__mapper__.column_attrs)
+
+# Columns rendered by the posts list views. Heavier columns such as
+# text_entities are deferred until a single post is opened.
+LIST_FIELDS = (
+    DraftPost.id,
+    DraftPost.author_id,
+    DraftPost.author_username,
+    DraftPost.text,
+    DraftPost.status,
+    DraftPost.scheduled_at,
+    DraftPost.created_at,
+)
+
+# Optional in-process cache of get_by_id results, see enable_post_cache()
+_post_cache: Optional[TTLCache] = None
+
+
+def enable_post_cache(maxsize: int = 1024, ttl: float = 30) -> None:
+    """
+    Cache get_by_id results in this process for ``ttl`` seconds.
+    
+    Cached posts are detached from their session. Every write that goes
+    through the repositories invalidates the post, so the cache is only
+    coherent while a single bot process writes to the database.
+    """
+    global _post_cache
+    _post_cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+
+# Optional in-process cache of list pages and counts, see enable_list_cache()
+_list_cache: Optional[TTLCache] = None
+
+
+def enable_list_cache(maxsize: int = 512, ttl: float = 5) -> None:
+    """
+    Cache post list pages and counts in this process for ``ttl`` seconds.
+    
+    Meant for bursts of pagination clicks. Any post write through the
+    repositories clears the whole cache, with the same single-process
+    caveat as enable_post_cache().
+    """
+    global _list_cache
+    _list_cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+
+def _invalidate_lists() -> None:
+    """Drop all cached list pages and counts."""
+    if _list_cache is not None:
+        _list_cache.clear()
+
+
+# session.info key of the posts get_by_id already returned in that session,
+# so a handler re-reading a post it has not changed skips the SELECT
+_SESSION_POSTS = "draft_posts_by_id"
+
+
+def _invalidate_post(post_id: Optional[int], session: Optional[AsyncSession] = None) -> None:
+    """Drop a post from the get_by_id caches and cached lists."""
+    if post_id is not None:
+        if _post_cache is not None:
+            _post_cache.pop(post_id, None)
+        if session is not None:
+            session.info.get(_SESSION_POSTS, {}).pop(post_id, None)
+    _invalidate_lists()
+
 
 class DraftPostRepository:
     """Repository for DraftPost operations."""
@@ -25,64 +102,213 @@ class DraftPostRepository:
         status: PostStatus = PostStatus.DRAFT,
     ) -> DraftPost:
         """Create a new draft post."""
-        post = DraftPost(
-            author_id=author_id,
-            author_username=author_username,
-            text=text,
-            text_entities=text_entities,
-            scheduled_at=scheduled_at,
-            status=status.value,
+        # INSERT ... RETURNING hydrates the post, server defaults included,
+        # in one round-trip. A new post has no media or buttons yet, so
+        # skip the relation loaders instead of querying for empty lists.
+        result = await self.session.execute(
+            insert(DraftPost)
+            .values(
+                author_id=author_id,
+                author_username=author_username,
+                text=text,
+                text_entities=text_entities,
+                scheduled_at=scheduled_at,
+                status=status.value,
+            )
+            .returning(DraftPost)
+            .options(noload(DraftPost.media), noload(DraftPost.buttons))
         )
-        self.session.add(post)
-        await self.session.flush()
-        return post
+        _invalidate_lists()
+        return result.scalar_one()
+
+    def _cached_post(self, post_id: int) -> Optional[DraftPost]:
+        """Post from this session's memo or the process cache, if there."""
+        seen = self.session.info.setdefault(_SESSION_POSTS, {})
+        if post_id not in seen and _post_cache is not None and post_id in _post_cache:
+            seen[post_id] = _post_cache[post_id]
+        return seen.get(post_id)
+
+    def _remember_post(self, post: DraftPost) -> None:
+        """Memoize a loaded post for the session and the process cache."""
+        self.session.info.setdefault(_SESSION_POSTS, {})[post.id] = post
+        if _post_cache is not None:
+            # Detach (with media and buttons) so other sessions can share it
+            self.session.expunge(post)
+            _post_cache[post.id] = post
 
     async def get_by_id(self, post_id: int) -> Optional[DraftPost]:
-        """Get draft post by ID."""
+        """Get draft post by ID, memoized for the rest of the session."""
+        post = self._cached_post(post_id)
+        if post is not None:
+            return post
+        
+        # Hot path: lambda_stmt caches the constructed statement, post_id
+        # becomes a bound parameter.
+        stmt = lambda_stmt(
+            lambda: select(DraftPost)
+            .where(DraftPost.id == post_id)
+            .options(*_POST_RELATIONS)
+        )
+        # Overwrite a copy already in the session: it may predate a write
+        # to its media or buttons
         result = await self.session.execute(
-            select(DraftPost).where(DraftPost.id == post_id)
+            stmt, execution_options={"populate_existing": True}
         )
-        return result.scalar_one_or_none()
+        post = result.scalar_one_or_none()
+        if post is not None:
+            self._remember_post(post)
+        return post
 
-    async def get_by_author(
+    async def get_by_id_if_visible(
         self,
-        author_id: int,
-        status: Optional[PostStatus] = None,
-        limit: int = 50,
-    ) -> Sequence[DraftPost]:
-        """Get all draft posts by author."""
-        stmt = select(DraftPost).where(DraftPost.author_id == author_id)
-        
-        if status:
-            stmt = stmt.where(DraftPost.status == status.value)
+        post_id: int,
+        user_id: int,
+        is_admin: bool = False,
+    ) -> Optional[DraftPost]:
+        """Get draft post by ID if the user is its author or an admin."""
+        if is_admin:
+            return await self.get_by_id(post_id)
+        post = self._cached_post(post_id)
+        if post is not None:
+            return post if post.author_id == user_id else None
         
-        stmt = stmt.order_by(DraftPost.created_at.desc()).limit(limit)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        # Someone else's post is filtered out in SQL, before any hydration
+        result = await self.session.execute(
+            select(DraftPost)
+            .where(DraftPost.id == post_id, DraftPost.author_id == user_id)
+            .options(*_POST_RELATIONS),
+            execution_options={"populate_existing": True},
+        )
+        post = result.scalar_one_or_none()
+        if post is not None:
+            self._remember_post(post)
+        return post
 
     async def get_scheduled(self) -> Sequence[DraftPost]:
         """Get all scheduled posts."""
         result = await self.session.execute(
             select(DraftPost)
             .where(DraftPost.status == PostStatus.SCHEDULED.value)
+            .options(*_POST_RELATIONS)
             .order_by(DraftPost.scheduled_at.asc())
         )
         return result.scalars().all()
 
-    async def get_all(
+    async def page_by_author(
+        self,
+        author_id: int,
+        status: Optional[PostStatus] = None,
+        limit: int = 50,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> Tuple[Sequence[DraftPost], int]:
+        """Get one page of an author's posts and their total count in one query.
+        
+        Pass ``after_id``/``before_id`` (the last/first post shown) to seek
+        from that post instead of skipping ``offset`` rows.
+        """
+        return await self._fetch_page(
+            ("page_author", author_id, status, limit, offset, after_id, before_id),
+            DraftPost.author_id == author_id,
+            status,
+            limit,
+            offset,
+            after_id,
+            before_id,
+        )
+
+    async def page_all(
         self,
         status: Optional[PostStatus] = None,
         limit: int = 100,
-    ) -> Sequence[DraftPost]:
-        """Get all posts (for admins)."""
-        stmt = select(DraftPost)
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> Tuple[Sequence[DraftPost], int]:
+        """Get one page of all posts (for admins) and the total count."""
+        return await self._fetch_page(
+            ("page_all", status, limit, offset, after_id, before_id),
+            None,
+            status,
+            limit,
+            offset,
+            after_id,
+            before_id,
+        )
+
+    async def _fetch_page(
+        self,
+        key: tuple,
+        criteria,
+        status: Optional[PostStatus],
+        limit: int,
+        offset: int,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> Tuple[Sequence[DraftPost], int]:
+        """Run a list query with the total count alongside the page rows.
         
+        With a cursor the page is found by seeking on (created_at, id) past
+        the cursor post, so deep pages cost the same as the first one.
+        """
+        if _list_cache is not None and key in _list_cache:
+            return _list_cache[key]
+        
+        filters = [] if criteria is None else [criteria]
         if status:
-            stmt = stmt.where(DraftPost.status == status.value)
+            filters.append(DraftPost.status == status.value)
         
-        stmt = stmt.order_by(DraftPost.created_at.desc()).limit(limit)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        cursor_id = after_id if after_id is not None else before_id
+        if cursor_id is None:
+            full_count = func.count().over()
+            stmt = (
+                select(DraftPost, full_count.label("full_count"))
+                .where(*filters)
+                .order_by(DraftPost.created_at.desc(), DraftPost.id.desc())
+                .offset(offset)
+            )
+        else:
+            # The window count would only see rows past the cursor
+            full_count = (
+                select(func.count()).select_from(DraftPost).where(*filters).scalar_subquery()
+            )
+            cursor = tuple_(
+                select(DraftPost.created_at).where(DraftPost.id == cursor_id).scalar_subquery(),
+                cursor_id,
+            )
+            position = tuple_(DraftPost.created_at, DraftPost.id)
+            stmt = select(DraftPost, full_count.label("full_count"))
+            if after_id is not None:
+                stmt = stmt.where(*filters, position < cursor).order_by(
+                    DraftPost.created_at.desc(), DraftPost.id.desc()
+                )
+            else:
+                stmt = stmt.where(*filters, position > cursor).order_by(
+                    DraftPost.created_at.asc(), DraftPost.id.asc()
+                )
+        
+        stmt = stmt.options(load_only(*LIST_FIELDS), *_POST_RELATIONS).limit(limit)
+        rows = (await self.session.execute(stmt)).all()
+        posts = [row[0] for row in rows]
+        if after_id is None and before_id is not None:
+            posts.reverse()
+        
+        if rows:
+            total = rows[0].full_count
+        elif offset or cursor_id is not None:
+            # A page past the end has no rows to carry the count
+            total = await self.session.scalar(
+                select(func.count()).select_from(DraftPost).where(*filters)
+            )
+        else:
+            total = 0
+        
+        if _list_cache is not None:
+            for post in posts:
+                self.session.expunge(post)
+            _list_cache[key] = (posts, total)
+        return posts, total
 
     async def get_due_for_publishing(self, now: datetime) -> Sequence[DraftPost]:
         """Get posts that are due for publishing."""
@@ -92,48 +318,192 @@ class DraftPostRepository:
                 DraftPost.status == PostStatus.SCHEDULED.value,
                 DraftPost.scheduled_at <= now,
             )
+            .options(*_POST_RELATIONS)
             .order_by(DraftPost.scheduled_at.asc())
         )
         return result.scalars().all()
 
+    async def claim_due_for_publishing(
+        self,
+        now: datetime,
+        batch_size: int = 50,
+        post_id: Optional[int] = None,
+        not_before: Optional[datetime] = None,
+    ) -> Sequence[DraftPost]:
+        """
+        Atomically claim due scheduled posts for publishing.
+        
+        Flips up to ``batch_size`` due posts from SCHEDULED to PUBLISHING in
+        a single UPDATE ... RETURNING. Rows locked by another worker are
+        skipped, so concurrent schedulers never publish the same post twice.
+        ``post_id`` limits the claim to one post, and ``not_before`` skips
+        posts that were due before it (missed for too long).
+        """
+        conditions = [
+            DraftPost.status == PostStatus.SCHEDULED.value,
+            DraftPost.scheduled_at <= now,
+        ]
+        if post_id is not None:
+            conditions.append(DraftPost.id == post_id)
+        if not_before is not None:
+            conditions.append(DraftPost.scheduled_at >= not_before)
+        
+        due_ids = (
+            select(DraftPost.id)
+            .where(*conditions)
+            .order_by(DraftPost.scheduled_at.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(DraftPost)
+            .where(DraftPost.id.in_(due_ids.scalar_subquery()))
+            .values(status=PostStatus.PUBLISHING.value)
+            .returning(DraftPost)
+            .options(*_POST_RELATIONS),
+            execution_options={
+                "populate_existing": True,
+                "synchronize_session": False,
+            },
+        )
+        posts = result.scalars().all()
+        for post in posts:
+            _invalidate_post(post.id, self.session)
+        return posts
+
+    async def claim_for_publishing(self, post_id: int) -> Optional[DraftPost]:
+        """
+        Atomically claim one post for immediate publishing.
+        
+        Flips the post to PUBLISHING in a single UPDATE ... RETURNING unless
+        it is already published or being published, so a double-clicked
+        "Publish" sends the post only once. Returns None if not claimed.
+        """
+        result = await self.session.execute(
+            update(DraftPost)
+            .where(
+                DraftPost.id == post_id,
+                DraftPost.status.not_in(
+                    (PostStatus.PUBLISHED.value, PostStatus.PUBLISHING.value)
+                ),
+            )
+            .values(status=PostStatus.PUBLISHING.value)
+            .returning(DraftPost)
+            .options(*_POST_RELATIONS),
+            execution_options={
+                "populate_existing": True,
+                "synchronize_session": False,
+            },
+        )
+        post = result.scalar_one_or_none()
+        _invalidate_post(post_id, self.session)
+        return post
+
     async def update(
         self,
         post_id: int,
         **kwargs,
     ) -> Optional[DraftPost]:
-        """Update draft post."""
-        await self.session.execute(
+        """
+        Update draft post and return the refreshed row.
+        
+        A post already loaded in the session is refreshed in place from
+        UPDATE ... RETURNING in a single statement, keeping its loaded media
+        and buttons. Otherwise the returned post has them selectin-loaded.
+        """
+        _invalidate_post(post_id, self.session)
+        post = self.session.identity_map.get(self.session.identity_key(DraftPost, post_id))
+        if post is not None:
+            result = await self.session.execute(
+                update(DraftPost)
+                .where(DraftPost.id == post_id)
+                .values(**kwargs)
+                .returning(*(getattr(DraftPost, key) for key in _POST_COLUMN_KEYS)),
+                execution_options={"synchronize_session": False},
+            )
+            row = result.one_or_none()
+            if row is None:
+                return None
+            for key, value in zip(_POST_COLUMN_KEYS, row):
+                set_committed_value(post, key, value)
+            return post
+        
+        result = await self.session.execute(
             update(DraftPost)
             .where(DraftPost.id == post_id)
             .values(**kwargs)
+            .returning(DraftPost),
+            execution_options={"populate_existing": True},
         )
-        await self.session.flush()
-        return await self.get_by_id(post_id)
+        return result.scalar_one_or_none()
 
     async def delete(self, post_id: int) -> bool:
         """Delete draft post."""
+        _invalidate_post(post_id, self.session)
         result = await self.session.execute(
             delete(DraftPost).where(DraftPost.id == post_id)
         )
         return result.rowcount > 0
 
+    async def _update_returning_id(self, stmt) -> Optional[int]:
+        """Execute an UPDATE ... RETURNING id and return the affected post ID."""
+        result = await self.session.execute(stmt.returning(DraftPost.id))
+        post_id = result.scalar_one_or_none()
+        _invalidate_post(post_id, self.session)
+        return post_id
+
     async def mark_published(
         self,
         post_id: int,
         message_id: int,
         published_at: datetime,
-    ) -> Optional[DraftPost]:
-        """Mark post as published."""
-        return await self.update(
-            post_id,
-            status=PostStatus.PUBLISHED.value,
-            published_message_id=message_id,
-            published_at=published_at,
+    ) -> Optional[int]:
+        """Mark post as published. Returns post ID or None if not found or already published."""
+        return await self._update_returning_id(
+            update(DraftPost)
+            .where(
+                DraftPost.id == post_id,
+                DraftPost.status != PostStatus.PUBLISHED.value,
+            )
+            .values(
+                status=PostStatus.PUBLISHED.value,
+                published_message_id=message_id,
+                published_at=published_at,
+                # A new channel message has not had its keyboard edited yet
+                published_keyboard_hash=None,
+            )
         )
 
-    async def mark_failed(self, post_id: int) -> Optional[DraftPost]:
-        """Mark post as failed."""
-        return await self.update(post_id, status=PostStatus.FAILED.value)
+    async def mark_failed(self, post_id: int) -> Optional[int]:
+        """Mark post as failed. Returns post ID or None if not found."""
+        return await self._update_returning_id(
+            update(DraftPost)
+            .where(DraftPost.id == post_id)
+            .values(status=PostStatus.FAILED.value)
+        )
+
+    async def fail_stale_publishing(self, older_than: datetime) -> List[int]:
+        """
+        Mark posts stuck in PUBLISHING since before ``older_than`` as failed.
+        
+        A crash or shutdown between claiming a post and recording the result
+        would otherwise leave it PUBLISHING for good. Such posts are failed
+        rather than re-queued, since the send may already have reached the
+        channel. Returns the IDs of the released posts.
+        """
+        result = await self.session.execute(
+            update(DraftPost)
+            .where(
+                DraftPost.status == PostStatus.PUBLISHING.value,
+                DraftPost.updated_at < older_than,
+            )
+            .values(status=PostStatus.FAILED.value)
+            .returning(DraftPost.id)
+        )
+        post_ids = list(result.scalars().all())
+        for post_id in post_ids:
+            _invalidate_post(post_id, self.session)
+        return post_ids
 
 
 class DraftMediaRepository:
@@ -152,6 +522,7 @@ class DraftMediaRepository:
         position: int = 0,
     ) -> DraftMedia:
         """Add media to a draft post."""
+        _invalidate_post(post_id, self.session)
         media = DraftMedia(
             post_id=post_id,
             file_id=file_id,
@@ -164,6 +535,37 @@ class DraftMediaRepository:
         await self.session.flush()
         return media
 
+    async def add_media_bulk(
+        self,
+        post_id: int,
+        items: Sequence[dict],
+    ) -> Sequence[DraftMedia]:
+        """
+        Add several media to a draft post in one INSERT.
+        
+        Items are dicts with file_id, media_type and optional
+        file_unique_id and caption; positions follow the list order.
+        """
+        if not items:
+            return []
+        _invalidate_post(post_id, self.session)
+        rows = [
+            {
+                "post_id": post_id,
+                "file_id": item["file_id"],
+                "file_unique_id": item.get("file_unique_id", item["file_id"]),
+                "media_type": item["media_type"],
+                "caption": item.get("caption"),
+                "position": i,
+            }
+            for i, item in enumerate(items)
+        ]
+        result = await self.session.scalars(
+            insert(DraftMedia).returning(DraftMedia, sort_by_parameter_order=True),
+            rows,
+        )
+        return result.all()
+
     async def get_by_post(self, post_id: int) -> Sequence[DraftMedia]:
         """Get all media for a post."""
         result = await self.session.execute(
@@ -175,6 +577,7 @@ class DraftMediaRepository:
 
     async def delete_by_post(self, post_id: int) -> int:
         """Delete all media for a post."""
+        _invalidate_post(post_id, self.session)
         result = await self.session.execute(
             delete(DraftMedia).where(DraftMedia.post_id == post_id)
         )
@@ -196,6 +599,7 @@ class DraftButtonRepository:
         position: int = 0,
     ) -> DraftButton:
         """Add button to a draft post."""
+        _invalidate_post(post_id, self.session)
         button = DraftButton(
             post_id=post_id,
             text=text,
@@ -207,6 +611,50 @@ class DraftButtonRepository:
         await self.session.flush()
         return button
 
+    async def add_buttons_bulk(
+        self,
+        post_id: int,
+        buttons: Sequence[Tuple[str, str]],
+        start_row: int = 0,
+    ) -> Sequence[DraftButton]:
+        """Add (text, url) buttons in one INSERT, one per row from start_row."""
+        if not buttons:
+            return []
+        _invalidate_post(post_id, self.session)
+        rows = [
+            {
+                "post_id": post_id,
+                "text": btn_text,
+                "url": btn_url,
+                "row": start_row + i,
+                "position": 0,
+            }
+            for i, (btn_text, btn_url) in enumerate(buttons)
+        ]
+        result = await self.session.scalars(
+            insert(DraftButton).returning(DraftButton, sort_by_parameter_order=True),
+            rows,
+        )
+        return result.all()
+
+    async def get_by_id(self, button_id: int) -> Optional[DraftButton]:
+        """Get button by ID."""
+        result = await self.session.execute(
+            select(DraftButton).where(DraftButton.id == button_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def next_row(self, post_id: int) -> Optional[int]:
+        """Row index after the post's last button, or None if there is no such post."""
+        result = await self.session.execute(
+            select(func.coalesce(func.max(DraftButton.row), -1) + 1)
+            .select_from(DraftPost)
+            .outerjoin(DraftButton, DraftButton.post_id == DraftPost.id)
+            .where(DraftPost.id == post_id)
+            .group_by(DraftPost.id)
+        )
+        return result.scalar_one_or_none()
+
     async def get_by_post(self, post_id: int) -> Sequence[DraftButton]:
         """Get all buttons for a post."""
         result = await self.session.execute(
@@ -218,6 +666,7 @@ class DraftButtonRepository:
 
     async def delete_by_post(self, post_id: int) -> int:
         """Delete all buttons for a post."""
+        _invalidate_post(post_id, self.session)
         result = await self.session.execute(
             delete(DraftButton).where(DraftButton.post_id == post_id)
         )
@@ -228,24 +677,29 @@ class DraftButtonRepository:
         button_id: int,
         **kwargs,
     ) -> Optional[DraftButton]:
-        """Update a button."""
-        await self.session.execute(
+        """Update a button and return the refreshed row."""
+        result = await self.session.execute(
             update(DraftButton)
             .where(DraftButton.id == button_id)
             .values(**kwargs)
+            .returning(DraftButton),
+            execution_options={"populate_existing": True},
         )
-        await self.session.flush()
-        result = await self.session.execute(
-            select(DraftButton).where(DraftButton.id == button_id)
-        )
-        return result.scalar_one_or_none()
+        button = result.scalar_one_or_none()
+        if button is not None:
+            _invalidate_post(button.post_id, self.session)
+        return button
 
     async def delete_button(self, button_id: int) -> bool:
         """Delete a button."""
         result = await self.session.execute(
-            delete(DraftButton).where(DraftButton.id == button_id)
+            delete(DraftButton)
+            .where(DraftButton.id == button_id)
+            .returning(DraftButton.post_id)
         )
-        return result.rowcount > 0
+        post_id = result.scalar_one_or_none()
+        _invalidate_post(post_id, self.session)
+        return post_id is not None
 
 
 async def create_post_with_relations(
@@ -287,30 +741,15 @@ async def create_post_with_relations(
         status=status,
     )
     
-    # Add media
+    # Add media and buttons with one INSERT each, then attach the inserted
+    # rows directly instead of reloading the post
+    media_objs = []
     if media_items:
-        media_repo = DraftMediaRepository(session)
-        for i, media in enumerate(media_items):
-            await media_repo.add_media(
-                post_id=post.id,
-                file_id=media["file_id"],
-                file_unique_id=media.get("file_unique_id", media["file_id"]),
-                media_type=media["media_type"],
-                position=i,
-            )
-    
-    # Add buttons
+        media_objs = await DraftMediaRepository(session).add_media_bulk(post.id, media_items)
+    button_objs = []
     if buttons:
-        button_repo = DraftButtonRepository(session)
-        for i, (btn_text, btn_url) in enumerate(buttons):
-            await button_repo.add_button(
-                post_id=post.id,
-                text=btn_text,
-                url=btn_url,
-                row=i,
-                position=0,
-            )
+        button_objs = await DraftButtonRepository(session).add_buttons_bulk(post.id, buttons)
     
-    # Refresh to get relations
-    await session.refresh(post)
+    set_committed_value(post, "media", list(media_objs))
+    set_committed_value(post, "buttons", list(button_objs))
     return post
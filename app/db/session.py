@@ -1,27 +1,57 @@
 """Database session management."""
 
+import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import NullPool
 
-from app.config import get_settings
+from app.config import settings
 
-settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# asyncpg caches prepared statements per connection by default, which
+# PgBouncer transaction pooling breaks; disable both caches behind it.
+connect_args = (
+    {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    if settings.pgbouncer
+    else {}
+)
+
+if settings.db_use_null_pool:
+    pool_args = {"poolclass": NullPool}
+else:
+    pool_args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
 
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=False,
-    pool_size=5,
-    max_overflow=10,
     pool_pre_ping=True,
+    query_cache_size=1200,
+    connect_args=connect_args,
+    **pool_args,
 )
 
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _log_pre_ping_failure(context) -> None:
+    """Log pool usage when pre-ping finds a dead pooled connection."""
+    if context.is_pre_ping:
+        logger.warning(f"Dropped a stale database connection, pool: {engine.pool.status()}")
+
+
 # Create session factory
 async_session_factory = async_sessionmaker(
     bind=engine,
@@ -30,6 +60,15 @@ async_session_factory = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only handlers share the pool but run in autocommit mode, which skips
+# the BEGIN/COMMIT round-trips around their single query
+read_session_factory = async_sessionmaker(
+    bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 
 @asynccontextmanager
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -45,6 +84,13 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
+@asynccontextmanager
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only database session; nothing is committed."""
+    async with read_session_factory() as session:
+        yield session
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting database session."""
     async with get_session() as session:
@@ -1,23 +1,40 @@
-"""Inline keyboards for the bot."""
+"""Inline keyboards for the bot.
 
-from typing import List, Optional
+Markups are pydantic models, so building them runs validation on every call.
+Static keyboards are built once at import time and parameterized ones are
+memoized; callers must treat the returned markups as read-only.
+
+Markups can't be handed to aiogram as pre-serialized JSON: method fields
+validate reply_markup as a model, and the whole method is dumped per request.
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 
+_MAIN_MENU = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="📝 Новый пост", callback_data="new_post"),
+        InlineKeyboardButton(text="📋 Черновики", callback_data="drafts"),
+    ],
+    [
+        InlineKeyboardButton(text="⏰ Запланированные", callback_data="scheduled"),
+    ],
+])
+
+_CANCEL = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="wizard_cancel")],
+])
+
+
 def main_menu_keyboard() -> InlineKeyboardMarkup:
     """Main menu keyboard."""
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="📝 Новый пост", callback_data="new_post"),
-            InlineKeyboardButton(text="📋 Черновики", callback_data="drafts"),
-        ],
-        [
-            InlineKeyboardButton(text="⏰ Запланированные", callback_data="scheduled"),
-        ],
-    ])
+    return _MAIN_MENU
 
 
+@lru_cache(maxsize=512)
 def post_actions_keyboard(post_id: int, status: str = "draft") -> InlineKeyboardMarkup:
     """Actions for a specific post."""
     buttons = [
@@ -45,6 +62,7 @@ def post_actions_keyboard(post_id: int, status: str = "draft") -> InlineKeyboard
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=512)
 def confirm_keyboard(action: str, post_id: int) -> InlineKeyboardMarkup:
     """Confirmation keyboard for dangerous actions."""
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -67,6 +85,17 @@ def pagination_keyboard(
     callback_prefix: str = "page",
 ) -> List[InlineKeyboardButton]:
     """Pagination buttons."""
+    # Callers may extend the row, so hand out a copy of the cached buttons
+    return list(_pagination_buttons(current_page, total_pages, callback_prefix))
+
+
+@lru_cache(maxsize=512)
+def _pagination_buttons(
+    current_page: int,
+    total_pages: int,
+    callback_prefix: str,
+) -> Tuple[InlineKeyboardButton, ...]:
+    """Build pagination buttons once per page/prefix combination."""
     buttons = []
     
     if current_page > 1:
@@ -86,9 +115,10 @@ def pagination_keyboard(
             callback_data=f"{callback_prefix}:{current_page + 1}"
         ))
     
-    return buttons
+    return tuple(buttons)
 
 
+@lru_cache(maxsize=512)
 def edit_post_keyboard(post_id: int) -> InlineKeyboardMarkup:
     """Edit options for a post."""
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -108,11 +138,10 @@ def edit_post_keyboard(post_id: int) -> InlineKeyboardMarkup:
 
 def cancel_keyboard() -> InlineKeyboardMarkup:
     """Simple cancel keyboard."""
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="❌ Отмена", callback_data="wizard_cancel")],
-    ])
+    return _CANCEL
 
 
+@lru_cache(maxsize=512)
 def skip_keyboard(callback_data: str = "skip") -> InlineKeyboardMarkup:
     """Skip step keyboard."""
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -123,6 +152,7 @@ def skip_keyboard(callback_data: str = "skip") -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=512)
 def done_keyboard(callback_data: str = "done") -> InlineKeyboardMarkup:
     """Done/finish keyboard."""
     return InlineKeyboardMarkup(inline_keyboard=[
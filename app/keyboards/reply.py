@@ -3,23 +3,28 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 
 
+_REMOVE = ReplyKeyboardRemove()
+
+_MAIN_REPLY = ReplyKeyboardMarkup(
+    keyboard=[
+        [
+            KeyboardButton(text="📝 Новый пост"),
+            KeyboardButton(text="📋 Черновики"),
+        ],
+        [
+            KeyboardButton(text="⏰ Запланированные"),
+            KeyboardButton(text="❓ Помощь"),
+        ],
+    ],
+    resize_keyboard=True,
+)
+
+
 def remove_keyboard() -> ReplyKeyboardRemove:
     """Remove reply keyboard."""
-    return ReplyKeyboardRemove()
+    return _REMOVE
 
 
 def main_reply_keyboard() -> ReplyKeyboardMarkup:
     """Main reply keyboard (optional)."""
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [
-                KeyboardButton(text="📝 Новый пост"),
-                KeyboardButton(text="📋 Черновики"),
-            ],
-            [
-                KeyboardButton(text="⏰ Запланированные"),
-                KeyboardButton(text="❓ Помощь"),
-            ],
-        ],
-        resize_keyboard=True,
-    )
+    return _MAIN_REPLY
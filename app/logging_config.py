@@ -1,16 +1,23 @@
 """Logging configuration."""
 
 import logging
+import queue
 import sys
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from pathlib import Path
+from typing import Optional
 
-from app.config import get_settings
+from app.config import settings
+
+# Records held in memory before they are written to the log file
+LOG_FILE_BUFFER_RECORDS = 100
+
+# Background thread that writes queued records to stdout and the log file
+_listener: Optional[QueueListener] = None
 
 
 def setup_logging() -> None:
     """Configure application logging."""
-    settings = get_settings()
-
     # Create logs directory if needed
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
@@ -24,16 +31,36 @@ def setup_logging() -> None:
     # Get log level from settings
     log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
 
+    # Real handlers run on the listener thread so log I/O never blocks
+    # the event loop
+    formatter = logging.Formatter(log_format, datefmt=date_format)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler = logging.FileHandler(logs_dir / "bot.log", encoding="utf-8", delay=True)
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    # Batch file writes; warnings and errors are written out immediately
+    buffered_file_handler = MemoryHandler(
+        LOG_FILE_BUFFER_RECORDS, flushLevel=logging.WARNING, target=file_handler
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # Only merge args into the message here; the listener's handlers apply
+    # the full format
+    queue_handler.setFormatter(logging.Formatter())
+
     # Configure root logger
     logging.basicConfig(
         level=log_level,
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(logs_dir / "bot.log", encoding="utf-8"),
-        ],
+        handlers=[queue_handler],
+    )
+
+    global _listener
+    _listener = QueueListener(
+        log_queue, stream_handler, buffered_file_handler, respect_handler_level=True
     )
+    _listener.start()
 
     # Reduce noise from external libraries
     logging.getLogger("aiogram").setLevel(logging.WARNING)
@@ -45,6 +72,17 @@ def setup_logging() -> None:
     logger.info(f"Logging configured with level: {settings.log_level}")
 
 
+def stop_logging() -> None:
+    """Flush queued log records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        # Closing flushes the buffered file handler
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance by name."""
     return logging.getLogger(name)
@@ -4,19 +4,31 @@ import asyncio
 import logging
 
 from app.bot import bot, dp
-from app.config import get_settings
+from app.config import settings
+from app.db.repo import enable_list_cache, enable_post_cache
 from app.db.session import engine
-from app.logging_config import setup_logging
+from app.logging_config import setup_logging, stop_logging
 from app.middlewares.admin_only import AdminOnlyMiddleware
 from app.middlewares.debug_logging import DebugLoggingMiddleware
+from app.middlewares.query_counter import QueryCounterMiddleware, install_query_counter
 from app.routers import common, drafts, edit_published, post_wizard
 from app.services.scheduler import shutdown_scheduler, start_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Guards against registering handlers twice, which would make aiogram walk
+# duplicate handlers and middlewares on every update
+_routers_registered = False
+_middlewares_registered = False
+
 
 def register_routers() -> None:
     """Register all routers with the dispatcher."""
+    global _routers_registered
+    if _routers_registered:
+        return
+    _routers_registered = True
+
     dp.include_router(common.router)
     dp.include_router(post_wizard.router)
     dp.include_router(drafts.router)
@@ -26,16 +38,32 @@ def register_routers() -> None:
 
 def register_middlewares() -> None:
     """Register middlewares with the dispatcher."""
-    settings = get_settings()
-
-    # Debug logging middleware (first, logs everything)
-    dp.message.middleware(DebugLoggingMiddleware())
+    global _middlewares_registered
+    if _middlewares_registered:
+        return
+    _middlewares_registered = True
 
-    # Admin-only middleware (second, filters non-admins)
-    dp.message.middleware(AdminOnlyMiddleware(admin_ids=settings.admin_ids))
-    dp.callback_query.middleware(AdminOnlyMiddleware(admin_ids=settings.admin_ids))
+    # Development-only middlewares are registered in debug mode only
+    debug_mode = settings.log_level.upper() == "DEBUG"
 
-    logger.info(f"Registered middlewares: DebugLoggingMiddleware, AdminOnlyMiddleware")
+    # Debug logging middleware (first, logs everything)
+    if debug_mode:
+        dp.message.middleware(DebugLoggingMiddleware())
+        logger.info("Registered middleware: DebugLoggingMiddleware")
+
+    # Admin-only middleware (second, filters non-admins); one stateless
+    # instance is shared by both observers
+    admin_middleware = AdminOnlyMiddleware(admin_ids=settings.admin_ids)
+    dp.message.middleware(admin_middleware)
+    dp.callback_query.middleware(admin_middleware)
+
+    logger.info("Registered middleware: AdminOnlyMiddleware")
+
+    # Query counter (warns about N+1 query patterns)
+    if debug_mode:
+        install_query_counter(engine)
+        dp.update.outer_middleware(QueryCounterMiddleware())
+        logger.info("Registered middleware: QueryCounterMiddleware")
     logger.info(f"Admin IDs: {settings.admin_ids}")
 
 
@@ -46,8 +74,8 @@ async def on_startup() -> None:
     # Start scheduler
     await start_scheduler()
     
-    # Get bot info
-    bot_info = await bot.get_me()
+    # Get bot info (Bot.me() caches it for later permission checks)
+    bot_info = await bot.me()
     logger.info(f"Bot started: @{bot_info.username}")
 
 
@@ -58,9 +86,16 @@ async def on_shutdown() -> None:
     # Shutdown scheduler
     await shutdown_scheduler()
     
+    # Push button edits still waiting to the channel
+    await edit_published.flush_channel_updates()
+    
     # Close database connections
     await engine.dispose()
     
+    # Close FSM storage and event isolation connections
+    await dp.storage.close()
+    await dp.fsm.events_isolation.close()
+    
     # Close bot session
     await bot.session.close()
     
@@ -72,6 +107,14 @@ async def main() -> None:
     # Setup logging
     setup_logging()
     
+    # Cache posts by ID if enabled
+    if settings.post_cache_ttl > 0:
+        enable_post_cache(ttl=settings.post_cache_ttl)
+        logger.info(f"Post cache enabled, ttl={settings.post_cache_ttl}s")
+    if settings.list_cache_ttl > 0:
+        enable_list_cache(ttl=settings.list_cache_ttl)
+        logger.info(f"List cache enabled, ttl={settings.list_cache_ttl}s")
+    
     # Register handlers
     register_routers()
     register_middlewares()
@@ -88,7 +131,18 @@ async def main() -> None:
         )
     finally:
         await on_shutdown()
+        stop_logging()
+
+
+def install_event_loop() -> None:
+    """Use uvloop as the event loop when it is available."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(main())
@@ -1,7 +1,7 @@
 """Admin-only access middleware."""
 
 import logging
-from typing import Any, Awaitable, Callable, Dict, List
+from typing import Any, Awaitable, Callable, Dict, Iterable
 
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery, TelegramObject
@@ -9,12 +9,36 @@ from aiogram.types import Message, CallbackQuery, TelegramObject
 logger = logging.getLogger(__name__)
 
 
+async def _deny_message(event: Message) -> None:
+    """Tell a non-admin the bot is unavailable."""
+    await event.answer(
+        "⛔ У вас нет доступа к этому боту.\n"
+        "Обратитесь к администратору."
+    )
+
+
+async def _deny_callback(event: CallbackQuery) -> None:
+    """Reject a non-admin button press with an alert."""
+    await event.answer(
+        "⛔ У вас нет доступа",
+        show_alert=True,
+    )
+
+
+# Exact-type dispatch avoids isinstance checks on every update
+_DENY_HANDLERS: Dict[type, Callable[[Any], Awaitable[None]]] = {
+    Message: _deny_message,
+    CallbackQuery: _deny_callback,
+}
+
+
 class AdminOnlyMiddleware(BaseMiddleware):
     """Middleware that allows only admins to use the bot."""
 
-    def __init__(self, admin_ids: List[int]):
-        """Initialize middleware with list of admin user IDs."""
-        self.admin_ids = admin_ids
+    def __init__(self, admin_ids: Iterable[int]):
+        """Initialize middleware with admin user IDs."""
+        # frozenset keeps the per-update membership check O(1)
+        self.admin_ids = frozenset(admin_ids)
         super().__init__()
 
     async def __call__(
@@ -24,14 +48,10 @@ class AdminOnlyMiddleware(BaseMiddleware):
         data: Dict[str, Any],
     ) -> Any:
         """Process incoming event and check if user is admin."""
-        user = None
-        
-        if isinstance(event, Message):
-            user = event.from_user
-        elif isinstance(event, CallbackQuery):
-            user = event.from_user
-        
+        user = getattr(event, "from_user", None)
         if user is None:
+            if type(event) is Message:
+                logger.warning("⚠️ Message received with from_user=None!")
             return await handler(event, data)
         
         if user.id not in self.admin_ids:
@@ -39,16 +59,9 @@ class AdminOnlyMiddleware(BaseMiddleware):
                 f"Unauthorized access attempt by user {user.id} ({user.username})"
             )
             
-            if isinstance(event, Message):
-                await event.answer(
-                    "⛔ У вас нет доступа к этому боту.\n"
-                    "Обратитесь к администратору."
-                )
-            elif isinstance(event, CallbackQuery):
-                await event.answer(
-                    "⛔ У вас нет доступа",
-                    show_alert=True,
-                )
+            deny = _DENY_HANDLERS.get(type(event))
+            if deny is not None:
+                await deny(event)
             return None
         
         return await handler(event, data)
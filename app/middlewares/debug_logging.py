@@ -33,20 +33,27 @@ class DebugLoggingMiddleware(BaseMiddleware):
 
             # Log message details
             logger.info(
-                f"📨 INCOMING MESSAGE | "
-                f"user_id={user_id} (@{username}) | "
-                f"chat_id={event.chat.id} | "
-                f"content_type={event.content_type} | "
-                f"text={repr(event.text)[:50] if event.text else None} | "
-                f"caption={repr(event.caption)[:50] if event.caption else None} | "
-                f"has_photo={bool(event.photo)} | "
-                f"has_video={bool(event.video)} | "
-                f"has_document={bool(event.document)} | "
-                f"state={current_state}"
+                "📨 INCOMING MESSAGE | "
+                "user_id=%s (@%s) | "
+                "chat_id=%s | "
+                "content_type=%s | "
+                "text=%s | "
+                "caption=%s | "
+                "has_photo=%s | "
+                "has_video=%s | "
+                "has_document=%s | "
+                "state=%s",
+                user_id,
+                username,
+                event.chat.id,
+                event.content_type,
+                repr(event.text[:50]) if event.text else None,
+                repr(event.caption[:50]) if event.caption else None,
+                bool(event.photo),
+                bool(event.video),
+                bool(event.document),
+                current_state,
             )
 
-            if event.from_user is None:
-                logger.warning("⚠️ Message received with from_user=None!")
-
         # Always pass to the next handler
         return await handler(event, data)
@@ -0,0 +1,56 @@
+"""Query counting middleware for spotting N+1 patterns in development."""
+
+import logging
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Per-update query counter; a one-item list so the SQLAlchemy greenlet
+# can increment it in place
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar("query_counter", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    """Increment the current update's query counter."""
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def install_query_counter(engine: AsyncEngine) -> None:
+    """Count SQL statements executed by the engine."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_query)
+
+
+class QueryCounterMiddleware(BaseMiddleware):
+    """Middleware that warns when handling one update runs too many queries."""
+
+    def __init__(self, threshold: int = 10):
+        """Initialize middleware with max expected queries per update."""
+        self.threshold = threshold
+        super().__init__()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Count queries executed while handling the event."""
+        counter = [0]
+        token = _query_counter.set(counter)
+        try:
+            return await handler(event, data)
+        finally:
+            _query_counter.reset(token)
+            if counter[0] > self.threshold:
+                logger.warning(
+                    f"⚠️ {counter[0]} queries while handling "
+                    f"{type(event).__name__} (threshold {self.threshold}), possible N+1"
+                )
@@ -1,90 +1,84 @@
 """Common handlers: /start, /help, /cancel, /whoami, /channelinfo."""
 
+import asyncio
 import logging
 
-from aiogram import Router
+from aiogram import Bot, Router
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, ChatMemberAdministrator, ChatMemberOwner
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 
-from app.bot import bot
-from app.config import get_settings
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = Router(name="common")
 
 
+# Static /start and /help bodies, built once for regular users and admins
+_START_TEXT_USER = (
+    "👋 <b>Привет!</b>\n\n"
+    "Я бот для создания и планирования публикаций в канал.\n\n"
+    "📝 <b>Команды:</b>\n"
+    "/new — создать новый пост\n"
+    "/posts — все мои посты\n"
+    "/drafts — черновики\n"
+    "/scheduled — запланированные посты\n"
+    "/edit &lt;ID&gt; — редактировать пост\n"
+    "/whoami — информация о вас\n"
+    "/channelinfo — информация о канале\n"
+    "/help — справка\n"
+    "/cancel — отмена текущего действия"
+)
+_START_TEXT_ADMIN = _START_TEXT_USER + (
+    "\n\n👑 <b>Админ-команды:</b>\n"
+    "/allposts — посты всех пользователей\n"
+)
+
+_HELP_TEXT_USER = (
+    "📚 <b>Справка</b>\n\n"
+    "<b>Создание поста:</b>\n"
+    "1. Отправьте /new для создания нового поста\n"
+    "2. Отправьте текст или фото с подписью\n"
+    "3. Добавьте ещё медиа для альбома (опционально)\n"
+    "4. Добавьте кнопки со ссылками\n"
+    "5. Выберите время публикации или опубликуйте сразу\n\n"
+    "<b>Управление постами:</b>\n"
+    "/posts — все ваши посты\n"
+    "/drafts — только черновики\n"
+    "/scheduled — запланированные посты\n"
+    "/edit &lt;ID&gt; — редактировать опубликованный пост\n\n"
+    "<b>Информация:</b>\n"
+    "/whoami — информация о вашем аккаунте\n"
+    "/channelinfo — информация о канале и правах бота\n\n"
+    "<b>Формат времени:</b>\n"
+    "• <code>сейчас</code> — немедленно\n"
+    "• <code>15:30</code> — сегодня в 15:30\n"
+    "• <code>завтра 15:30</code> — завтра в 15:30\n"
+    "• <code>25.01 15:30</code> — конкретная дата"
+)
+_HELP_TEXT_ADMIN = _HELP_TEXT_USER + (
+    "\n\n👑 <b>Админ-команды:</b>\n"
+    "/allposts — посты всех пользователей\n"
+    "Можно редактировать чужие посты через /edit &lt;ID&gt;"
+)
+
+
 @router.message(CommandStart())
 async def cmd_start(message: Message) -> None:
     """Handle /start command."""
     logger.info(f"User {message.from_user.id} started the bot")
     
-    settings = get_settings()
     is_admin = message.from_user.id in settings.admin_ids
-    
-    admin_commands = ""
-    if is_admin:
-        admin_commands = (
-            "\n\n👑 <b>Админ-команды:</b>\n"
-            "/allposts — посты всех пользователей\n"
-        )
-    
-    await message.answer(
-        "👋 <b>Привет!</b>\n\n"
-        "Я бот для создания и планирования публикаций в канал.\n\n"
-        "📝 <b>Команды:</b>\n"
-        "/new — создать новый пост\n"
-        "/posts — все мои посты\n"
-        "/drafts — черновики\n"
-        "/scheduled — запланированные посты\n"
-        "/edit &lt;ID&gt; — редактировать пост\n"
-        "/whoami — информация о вас\n"
-        "/channelinfo — информация о канале\n"
-        "/help — справка\n"
-        "/cancel — отмена текущего действия"
-        f"{admin_commands}"
-    )
+    await message.answer(_START_TEXT_ADMIN if is_admin else _START_TEXT_USER)
 
 
 @router.message(Command("help"))
 async def cmd_help(message: Message) -> None:
     """Handle /help command."""
-    settings = get_settings()
     is_admin = message.from_user.id in settings.admin_ids
-    
-    admin_help = ""
-    if is_admin:
-        admin_help = (
-            "\n\n👑 <b>Админ-команды:</b>\n"
-            "/allposts — посты всех пользователей\n"
-            "Можно редактировать чужие посты через /edit &lt;ID&gt;"
-        )
-    
-    await message.answer(
-        "📚 <b>Справка</b>\n\n"
-        "<b>Создание поста:</b>\n"
-        "1. Отправьте /new для создания нового поста\n"
-        "2. Отправьте текст или фото с подписью\n"
-        "3. Добавьте ещё медиа для альбома (опционально)\n"
-        "4. Добавьте кнопки со ссылками\n"
-        "5. Выберите время публикации или опубликуйте сразу\n\n"
-        "<b>Управление постами:</b>\n"
-        "/posts — все ваши посты\n"
-        "/drafts — только черновики\n"
-        "/scheduled — запланированные посты\n"
-        "/edit &lt;ID&gt; — редактировать опубликованный пост\n\n"
-        "<b>Информация:</b>\n"
-        "/whoami — информация о вашем аккаунте\n"
-        "/channelinfo — информация о канале и правах бота\n\n"
-        "<b>Формат времени:</b>\n"
-        "• <code>сейчас</code> — немедленно\n"
-        "• <code>15:30</code> — сегодня в 15:30\n"
-        "• <code>завтра 15:30</code> — завтра в 15:30\n"
-        "• <code>25.01 15:30</code> — конкретная дата"
-        f"{admin_help}"
-    )
+    await message.answer(_HELP_TEXT_ADMIN if is_admin else _HELP_TEXT_USER)
 
 
 @router.message(Command("cancel"))
@@ -103,7 +97,6 @@ async def cmd_cancel(message: Message, state: FSMContext) -> None:
 @router.message(Command("whoami"))
 async def cmd_whoami(message: Message) -> None:
     """Handle /whoami command - show user info and config."""
-    settings = get_settings()
     user = message.from_user
 
     # Build full name
@@ -123,14 +116,24 @@ async def cmd_whoami(message: Message) -> None:
 
 
 @router.message(Command("channelinfo"))
-async def cmd_channelinfo(message: Message) -> None:
+async def cmd_channelinfo(message: Message, bot: Bot) -> None:
     """Handle /channelinfo command - show channel info and bot permissions."""
-    settings = get_settings()
+    # Imported here so loading the router does not create the bot client
+    from app.services.permissions import get_channel_chat
+
     channel_id = settings.channel_id
 
     try:
-        # Get channel info
-        chat = await bot.get_chat(channel_id)
+        # Get channel info and the bot's membership concurrently; the
+        # membership error is reported below, so keep it as a result
+        bot_info = await bot.me()
+        chat, member = await asyncio.gather(
+            get_channel_chat(),
+            bot.get_chat_member(channel_id, bot_info.id),
+            return_exceptions=True,
+        )
+        if isinstance(chat, BaseException):
+            raise chat
 
         # Build channel info
         username_str = f"@{chat.username}" if chat.username else "<i>приватный</i>"
@@ -145,8 +148,8 @@ async def cmd_channelinfo(message: Message) -> None:
 
         # Check bot permissions
         try:
-            bot_info = await bot.get_me()
-            member = await bot.get_chat_member(chat.id, bot_info.id)
+            if isinstance(member, BaseException):
+                raise member
 
             if isinstance(member, ChatMemberOwner):
                 response += (
@@ -1,17 +1,23 @@
 """Drafts and posts management handlers."""
 
 import logging
-from datetime import datetime
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
 
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 
-from app.config import get_settings
+from app.config import settings
 from app.db.models import PostStatus
 from app.db.repo import DraftPostRepository
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
 from app.services.datetime_parse import format_datetime
+from app.services.publishing import publish_post
+from app.services.scheduler import cancel_scheduled_post
+from app.utils.telegram import post_id_filter
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +25,162 @@ router = Router(name="drafts")
 
 POSTS_PER_PAGE = 5
 
+# Callback data prefixes for per-post actions; builders append the post ID
+_CB_POST_VIEW = "post_view_"
+_CB_POST_PUBLISH = "post_publish_"
+_CB_POST_SCHEDULE = "post_schedule_"
+_CB_POST_EDIT = "post_edit_"
+_CB_POST_DELETE = "post_delete_"
+_CB_POST_UNSCHEDULE = "post_unschedule_"
+# Page indicator; carries "<page>_<filter>" so a repeat click is recognised
+_CB_PAGE_NOOP = "posts_noop_"
+
+# Callback data parsers, matched by the handler filters so each handler gets
+# typed fields from the injected ``match`` instead of splitting strings.
+# posts_page_<page>_[a<last_id>_|b<first_id>_]<filter>; the cursor is
+# optional so buttons sent before it was added keep working
+_PAGE_RE = re.compile(r"^posts_page_(\d+)_(?:([ab])(\d+)_)?(\w+)$")
+_FILTER_RE = re.compile(r"^posts_filter_(\w+)$")
+
+
+# Status values as plain strings, resolved once instead of per comparison
+_ST_DRAFT = PostStatus.DRAFT.value
+_ST_SCHEDULED = PostStatus.SCHEDULED.value
+_ST_PUBLISHING = PostStatus.PUBLISHING.value
+_ST_PUBLISHED = PostStatus.PUBLISHED.value
+_ST_FAILED = PostStatus.FAILED.value
+
+_STATUS_EMOJI = {
+    _ST_DRAFT: "📝",
+    _ST_SCHEDULED: "⏰",
+    _ST_PUBLISHING: "📤",
+    _ST_PUBLISHED: "✅",
+    _ST_FAILED: "❌",
+}
+
+# Status filters from callback data and their display strings. Filter
+# tokens are the enum values themselves; "all" maps to no status
+_STATUS_MAP = {
+    status.value: status
+    for status in (PostStatus.DRAFT, PostStatus.SCHEDULED, PostStatus.PUBLISHED)
+}
+
+_FILTER_TITLE = {
+    "draft": "Черновики",
+    "scheduled": "Запланированные",
+    "published": "Опубликованные",
+    "all": "Все посты",
+}
+
+# Genitive forms for the "no posts" message
+_FILTER_GENITIVE = {
+    "draft": "черновиков",
+    "scheduled": "запланированных постов",
+    "published": "опубликованных постов",
+    "all": "постов",
+}
+
+# "No posts" replies for every filter, built once
+_EMPTY_LIST_TEXT = {
+    status_filter: (
+        "📋 <b>Ваши посты</b>\n\n"
+        f"<i>У вас нет {genitive}.</i>\n\n"
+        "Создайте новый пост командой /new"
+    )
+    for status_filter, genitive in _FILTER_GENITIVE.items()
+}
+
+_STATUS_TEXT = {
+    _ST_DRAFT: "📝 Черновик",
+    _ST_SCHEDULED: "⏰ Запланирован",
+    _ST_PUBLISHING: "📤 Публикуется",
+    _ST_PUBLISHED: "✅ Опубликован",
+    _ST_FAILED: "❌ Ошибка публикации",
+}
+
+
+def _build_filter_rows(status_filter: str) -> list:
+    """Build filter button rows with the active filter checked."""
+    return [
+        [
+            InlineKeyboardButton(
+                text="📝 Черновики" + (" ✓" if status_filter == "draft" else ""),
+                callback_data="posts_filter_draft",
+            ),
+            InlineKeyboardButton(
+                text="⏰ Запланированные" + (" ✓" if status_filter == "scheduled" else ""),
+                callback_data="posts_filter_scheduled",
+            ),
+        ],
+        [
+            InlineKeyboardButton(
+                text="✅ Опубликованные" + (" ✓" if status_filter == "published" else ""),
+                callback_data="posts_filter_published",
+            ),
+            InlineKeyboardButton(
+                text="📋 Все" + (" ✓" if status_filter == "all" else ""),
+                callback_data="posts_filter_all",
+            ),
+        ],
+    ]
+
+
+# Filter rows only depend on the active filter, so build them once
+_FILTER_ROWS = {
+    status_filter: _build_filter_rows(status_filter)
+    for status_filter in ("draft", "scheduled", "published", "all")
+}
+_FILTER_ROWS_UNCHECKED = _build_filter_rows("")
+
+
+def _text_preview(text: Optional[str]) -> str:
+    """Shorten post text for a list button."""
+    if not text:
+        return "—"
+    return text[:20] + "..." if len(text) > 20 else text
+
+
+def _author_prefix(username: Optional[str]) -> str:
+    """Author label for the all-posts view."""
+    return f"@{username[:8]} " if username else ""
+
+
+def _post_button(post) -> InlineKeyboardButton:
+    """List button for one of the user's own posts."""
+    return InlineKeyboardButton(
+        text=f"{_STATUS_EMOJI.get(post.status, '❓')} #{post.id} {_text_preview(post.text)}",
+        callback_data=f"{_CB_POST_VIEW}{post.id}",
+    )
+
+
+def _post_button_with_author(post) -> InlineKeyboardButton:
+    """List button for the all-posts view, labelled with the author."""
+    return InlineKeyboardButton(
+        text=f"{_STATUS_EMOJI.get(post.status, '❓')} #{post.id} "
+        f"{_author_prefix(post.author_username)}{_text_preview(post.text)}",
+        callback_data=f"{_CB_POST_VIEW}{post.id}",
+    )
+
+
+def _page_callback(page: int, direction: str, edge: list, status_filter: str) -> str:
+    """Build a page button's callback data, with the edge post as cursor."""
+    if not edge:
+        return f"posts_page_{page}_{status_filter}"
+    return f"posts_page_{page}_{direction}{edge[0].id}_{status_filter}"
+
+
+def _shown_page(message) -> Optional[str]:
+    """Return the "<page>_<filter>" of the list a message currently shows."""
+    markup = getattr(message, "reply_markup", None)
+    if markup is None:
+        return None
+    for row in markup.inline_keyboard:
+        for button in row:
+            data = button.callback_data
+            if data and data.startswith(_CB_PAGE_NOOP):
+                return data[len(_CB_PAGE_NOOP):]
+    return None
+
 
 def posts_list_keyboard(
     posts: list,
@@ -28,89 +190,53 @@ def posts_list_keyboard(
     show_author: bool = False,
 ) -> InlineKeyboardMarkup:
     """Build keyboard for posts list."""
-    kb = []
-    
-    for post in posts:
-        # Status emoji
-        status_emoji = {
-            PostStatus.DRAFT.value: "📝",
-            PostStatus.SCHEDULED.value: "⏰",
-            PostStatus.PUBLISHED.value: "✅",
-            PostStatus.FAILED.value: "❌",
-        }.get(post.status, "❓")
-        
-        # Text preview
-        text_preview = (post.text[:20] + "...") if post.text and len(post.text) > 20 else (post.text or "—")
-        
-        # Add author for allposts view
-        author_str = ""
-        if show_author and post.author_username:
-            author_str = f"@{post.author_username[:8]} "
-        
-        kb.append([
-            InlineKeyboardButton(
-                text=f"{status_emoji} #{post.id} {author_str}{text_preview}",
-                callback_data=f"post_view_{post.id}",
-            )
-        ])
+    post_button = _post_button_with_author if show_author else _post_button
+    kb = [[post_button(post)] for post in posts]
     
     # Pagination
     nav_row = []
     if page > 0:
-        nav_row.append(InlineKeyboardButton(text="◀️", callback_data=f"posts_page_{page-1}_{status_filter}"))
-    nav_row.append(InlineKeyboardButton(text=f"{page+1}/{total_pages}", callback_data="posts_noop"))
+        nav_row.append(InlineKeyboardButton(text="◀️", callback_data=_page_callback(page - 1, "b", posts[:1], status_filter)))
+    nav_row.append(InlineKeyboardButton(text=f"{page+1}/{total_pages}", callback_data=f"{_CB_PAGE_NOOP}{page}_{status_filter}"))
     if page < total_pages - 1:
-        nav_row.append(InlineKeyboardButton(text="▶️", callback_data=f"posts_page_{page+1}_{status_filter}"))
+        nav_row.append(InlineKeyboardButton(text="▶️", callback_data=_page_callback(page + 1, "a", posts[-1:], status_filter)))
     
     if nav_row:
         kb.append(nav_row)
     
     # Filter buttons
-    kb.append([
-        InlineKeyboardButton(
-            text="📝 Черновики" + (" ✓" if status_filter == "draft" else ""),
-            callback_data="posts_filter_draft",
-        ),
-        InlineKeyboardButton(
-            text="⏰ Запланированные" + (" ✓" if status_filter == "scheduled" else ""),
-            callback_data="posts_filter_scheduled",
-        ),
-    ])
-    kb.append([
-        InlineKeyboardButton(
-            text="✅ Опубликованные" + (" ✓" if status_filter == "published" else ""),
-            callback_data="posts_filter_published",
-        ),
-        InlineKeyboardButton(
-            text="📋 Все" + (" ✓" if status_filter == "all" else ""),
-            callback_data="posts_filter_all",
-        ),
-    ])
+    kb.extend(_FILTER_ROWS.get(status_filter, _FILTER_ROWS_UNCHECKED))
     
     return InlineKeyboardMarkup(inline_keyboard=kb)
 
 
 def post_view_keyboard(post) -> InlineKeyboardMarkup:
     """Build keyboard for post view."""
+    return _post_view_keyboard(post.status, post.id)
+
+
+@lru_cache(maxsize=1024)
+def _post_view_keyboard(status: str, post_id: int) -> InlineKeyboardMarkup:
+    """Build post view keyboard once per status/post pair."""
     kb = []
     
-    if post.status == PostStatus.DRAFT.value:
+    if status == _ST_DRAFT:
         kb.append([
-            InlineKeyboardButton(text="📤 Опубликовать", callback_data=f"post_publish_{post.id}"),
-            InlineKeyboardButton(text="⏰ Запланировать", callback_data=f"post_schedule_{post.id}"),
+            InlineKeyboardButton(text="📤 Опубликовать", callback_data=f"{_CB_POST_PUBLISH}{post_id}"),
+            InlineKeyboardButton(text="⏰ Запланировать", callback_data=f"{_CB_POST_SCHEDULE}{post_id}"),
         ])
         kb.append([
-            InlineKeyboardButton(text="✏️ Редактировать", callback_data=f"post_edit_{post.id}"),
-            InlineKeyboardButton(text="🗑 Удалить", callback_data=f"post_delete_{post.id}"),
+            InlineKeyboardButton(text="✏️ Редактировать", callback_data=f"{_CB_POST_EDIT}{post_id}"),
+            InlineKeyboardButton(text="🗑 Удалить", callback_data=f"{_CB_POST_DELETE}{post_id}"),
         ])
-    elif post.status == PostStatus.SCHEDULED.value:
+    elif status == _ST_SCHEDULED:
         kb.append([
-            InlineKeyboardButton(text="📤 Опубликовать сейчас", callback_data=f"post_publish_{post.id}"),
-            InlineKeyboardButton(text="❌ Отменить", callback_data=f"post_unschedule_{post.id}"),
+            InlineKeyboardButton(text="📤 Опубликовать сейчас", callback_data=f"{_CB_POST_PUBLISH}{post_id}"),
+            InlineKeyboardButton(text="❌ Отменить", callback_data=f"{_CB_POST_UNSCHEDULE}{post_id}"),
         ])
-    elif post.status == PostStatus.PUBLISHED.value:
+    elif status == _ST_PUBLISHED:
         kb.append([
-            InlineKeyboardButton(text="✏️ Редактировать", callback_data=f"post_edit_{post.id}"),
+            InlineKeyboardButton(text="✏️ Редактировать", callback_data=f"{_CB_POST_EDIT}{post_id}"),
         ])
     
     kb.append([InlineKeyboardButton(text="⬅️ Назад к списку", callback_data="posts_back")])
@@ -143,7 +269,6 @@ async def cmd_list_scheduled(message: Message) -> None:
 @router.message(Command("allposts"))
 async def cmd_all_posts(message: Message) -> None:
     """Show all posts from all users (admin only)."""
-    settings = get_settings()
     user_id = message.from_user.id
     
     if user_id not in settings.admin_ids:
@@ -155,208 +280,155 @@ async def cmd_all_posts(message: Message) -> None:
 
 async def _show_all_posts_list(message: Message, status_filter: str, page: int = 0) -> None:
     """Show all posts from all users (admin view)."""
-    async with get_session() as session:
+    status = _STATUS_MAP.get(status_filter)
+    
+    async with get_read_session() as session:
         repo = DraftPostRepository(session)
-        
-        status = None
-        if status_filter == "draft":
-            status = PostStatus.DRAFT
-        elif status_filter == "scheduled":
-            status = PostStatus.SCHEDULED
-        elif status_filter == "published":
-            status = PostStatus.PUBLISHED
-        
-        all_posts = await repo.get_all(status=status, limit=100)
-        
-        if not all_posts:
-            await message.answer(
-                "👑 <b>Все посты (админ)</b>\n\n"
-                "<i>Постов нет.</i>"
-            )
-            return
-        
-        total_pages = (len(all_posts) + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
-        start = page * POSTS_PER_PAGE
-        end = start + POSTS_PER_PAGE
-        posts_page = all_posts[start:end]
-        
+        posts_page, total = await repo.page_all(
+            status=status, limit=POSTS_PER_PAGE, offset=page * POSTS_PER_PAGE
+        )
+    
+    # Reply after the session is closed so no connection is held during the RTT
+    if not total:
         await message.answer(
-            f"👑 <b>Все посты (админ)</b> ({len(all_posts)} шт.)\n\n"
-            "Выберите пост для просмотра:",
-            reply_markup=posts_list_keyboard(posts_page, page, total_pages, f"admin_{status_filter}", show_author=True),
+            "👑 <b>Все посты (админ)</b>\n\n"
+            "<i>Постов нет.</i>"
         )
-        
-        logger.info(f"Admin {message.from_user.id} requested all posts list")
+        return
+    
+    total_pages = (total + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
+    await message.answer(
+        f"👑 <b>Все посты (админ)</b> ({total} шт.)\n\n"
+        "Выберите пост для просмотра:",
+        reply_markup=posts_list_keyboard(posts_page, page, total_pages, f"admin_{status_filter}", show_author=True),
+    )
+    
+    logger.info(f"Admin {message.from_user.id} requested all posts list")
 
 
 async def _show_posts_list(message: Message, status_filter: str, page: int = 0) -> None:
     """Show posts list with filter."""
     user_id = message.from_user.id
+    status = _STATUS_MAP.get(status_filter)
     
-    async with get_session() as session:
+    async with get_read_session() as session:
         repo = DraftPostRepository(session)
-        
-        # Get posts based on filter
-        status = None
-        if status_filter == "draft":
-            status = PostStatus.DRAFT
-        elif status_filter == "scheduled":
-            status = PostStatus.SCHEDULED
-        elif status_filter == "published":
-            status = PostStatus.PUBLISHED
-        
-        all_posts = await repo.get_by_author(user_id, status=status, limit=100)
-        
-        if not all_posts:
-            filter_text = {
-                "draft": "черновиков",
-                "scheduled": "запланированных постов",
-                "published": "опубликованных постов",
-                "all": "постов",
-            }.get(status_filter, "постов")
-            
-            await message.answer(
-                f"📋 <b>Ваши посты</b>\n\n"
-                f"<i>У вас нет {filter_text}.</i>\n\n"
-                "Создайте новый пост командой /new"
-            )
-            return
-        
-        # Pagination
-        total_pages = (len(all_posts) + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
-        start = page * POSTS_PER_PAGE
-        end = start + POSTS_PER_PAGE
-        posts_page = all_posts[start:end]
-        
-        filter_title = {
-            "draft": "Черновики",
-            "scheduled": "Запланированные",
-            "published": "Опубликованные",
-            "all": "Все посты",
-        }.get(status_filter, "Посты")
-        
-        await message.answer(
-            f"📋 <b>{filter_title}</b> ({len(all_posts)} шт.)\n\n"
-            "Выберите пост для просмотра:",
-            reply_markup=posts_list_keyboard(posts_page, page, total_pages, status_filter),
+        posts_page, total = await repo.page_by_author(
+            user_id, status=status, limit=POSTS_PER_PAGE, offset=page * POSTS_PER_PAGE
         )
-        
-        logger.info(f"User {user_id} requested posts list (filter: {status_filter})")
+    
+    if not total:
+        await message.answer(_EMPTY_LIST_TEXT.get(status_filter, _EMPTY_LIST_TEXT["all"]))
+        return
+    
+    # Pagination
+    total_pages = (total + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
+    filter_title = _FILTER_TITLE.get(status_filter, "Посты")
+    
+    await message.answer(
+        f"📋 <b>{filter_title}</b> ({total} шт.)\n\n"
+        "Выберите пост для просмотра:",
+        reply_markup=posts_list_keyboard(posts_page, page, total_pages, status_filter),
+    )
+    
+    logger.info(f"User {user_id} requested posts list (filter: {status_filter})")
 
 
 # =============================================================================
 # Pagination and filtering
 # =============================================================================
 
-@router.callback_query(F.data.startswith("posts_page_"))
-async def handle_page_change(callback: CallbackQuery) -> None:
+@router.callback_query(F.data.regexp(_PAGE_RE).as_("match"))
+async def handle_page_change(callback: CallbackQuery, match: re.Match) -> None:
     """Handle pagination."""
-    parts = callback.data.split("_")
-    page = int(parts[2])
-    status_filter = "_".join(parts[3:])  # Handle admin_all, admin_draft, etc.
+    page = int(match.group(1))
+    direction, cursor_id = match.group(2), match.group(3)
+    status_filter = match.group(4)  # Handle admin_all, admin_draft, etc.
     
     user_id = callback.from_user.id
     is_admin_view = status_filter.startswith("admin_")
     
-    async with get_session() as session:
+    # Parse status from filter
+    actual_filter = status_filter.replace("admin_", "") if is_admin_view else status_filter
+    status = _STATUS_MAP.get(actual_filter)
+    
+    if _shown_page(callback.message) == f"{page}_{status_filter}":
+        # A double click or a stale button for the page already on screen
+        await callback.answer()
+        return
+    
+    # Seek from the post at the page edge; fall back to OFFSET for old buttons
+    page_args = {"limit": POSTS_PER_PAGE}
+    if cursor_id is None:
+        page_args["offset"] = page * POSTS_PER_PAGE
+    elif direction == "a":
+        page_args["after_id"] = int(cursor_id)
+    else:
+        page_args["before_id"] = int(cursor_id)
+    
+    async with get_read_session() as session:
         repo = DraftPostRepository(session)
         
-        # Parse status from filter
-        actual_filter = status_filter.replace("admin_", "") if is_admin_view else status_filter
-        status = None
-        if actual_filter == "draft":
-            status = PostStatus.DRAFT
-        elif actual_filter == "scheduled":
-            status = PostStatus.SCHEDULED
-        elif actual_filter == "published":
-            status = PostStatus.PUBLISHED
-        
-        # Get posts based on view type
-        if is_admin_view:
-            all_posts = await repo.get_all(status=status, limit=100)
-        else:
-            all_posts = await repo.get_by_author(user_id, status=status, limit=100)
-        
-        total_pages = (len(all_posts) + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
-        start = page * POSTS_PER_PAGE
-        end = start + POSTS_PER_PAGE
-        posts_page = all_posts[start:end]
-        
-        filter_title = {
-            "draft": "Черновики",
-            "scheduled": "Запланированные",
-            "published": "Опубликованные",
-            "all": "Все посты",
-        }.get(actual_filter, "Посты")
-        
+        # Get the requested page based on view type
         if is_admin_view:
-            title = f"👑 <b>Все посты (админ) - {filter_title}</b>"
+            posts_page, total = await repo.page_all(status=status, **page_args)
         else:
-            title = f"📋 <b>{filter_title}</b>"
-        
-        await callback.message.edit_text(
-            f"{title} ({len(all_posts)} шт.)\n\n"
-            "Выберите пост для просмотра:",
-            reply_markup=posts_list_keyboard(posts_page, page, total_pages, status_filter, show_author=is_admin_view),
-        )
-        await callback.answer()
+            posts_page, total = await repo.page_by_author(user_id, status=status, **page_args)
+        
+        if not posts_page and cursor_id is not None:
+            # The cursor post is gone; locate the page by number instead
+            page_args = {"limit": POSTS_PER_PAGE, "offset": page * POSTS_PER_PAGE}
+            if is_admin_view:
+                posts_page, total = await repo.page_all(status=status, **page_args)
+            else:
+                posts_page, total = await repo.page_by_author(user_id, status=status, **page_args)
+    
+    total_pages = (total + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
+    
+    filter_title = _FILTER_TITLE.get(actual_filter, "Посты")
+    
+    if is_admin_view:
+        title = f"👑 <b>Все посты (админ) - {filter_title}</b>"
+    else:
+        title = f"📋 <b>{filter_title}</b>"
+    
+    await callback.message.edit_text(
+        f"{title} ({total} шт.)\n\n"
+        "Выберите пост для просмотра:",
+        reply_markup=posts_list_keyboard(posts_page, page, total_pages, status_filter, show_author=is_admin_view),
+    )
+    await callback.answer()
 
 
-@router.callback_query(F.data.startswith("posts_filter_"))
-async def handle_filter_change(callback: CallbackQuery) -> None:
+@router.callback_query(F.data.regexp(_FILTER_RE).as_("match"))
+async def handle_filter_change(callback: CallbackQuery, match: re.Match) -> None:
     """Handle filter change."""
-    status_filter = callback.data.split("_")[2]
+    status_filter = match.group(1)
     
     user_id = callback.from_user.id
+    status = _STATUS_MAP.get(status_filter)
     
-    async with get_session() as session:
+    async with get_read_session() as session:
         repo = DraftPostRepository(session)
-        
-        status = None
-        if status_filter == "draft":
-            status = PostStatus.DRAFT
-        elif status_filter == "scheduled":
-            status = PostStatus.SCHEDULED
-        elif status_filter == "published":
-            status = PostStatus.PUBLISHED
-        
-        all_posts = await repo.get_by_author(user_id, status=status, limit=100)
-        
-        if not all_posts:
-            filter_text = {
-                "draft": "черновиков",
-                "scheduled": "запланированных постов",
-                "published": "опубликованных постов",
-                "all": "постов",
-            }.get(status_filter, "постов")
-            
-            await callback.message.edit_text(
-                f"📋 <b>Ваши посты</b>\n\n"
-                f"<i>У вас нет {filter_text}.</i>\n\n"
-                "Создайте новый пост командой /new"
-            )
-            await callback.answer()
-            return
-        
-        total_pages = (len(all_posts) + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
-        posts_page = all_posts[:POSTS_PER_PAGE]
-        
-        filter_title = {
-            "draft": "Черновики",
-            "scheduled": "Запланированные",
-            "published": "Опубликованные",
-            "all": "Все посты",
-        }.get(status_filter, "Посты")
-        
-        await callback.message.edit_text(
-            f"📋 <b>{filter_title}</b> ({len(all_posts)} шт.)\n\n"
-            "Выберите пост для просмотра:",
-            reply_markup=posts_list_keyboard(posts_page, 0, total_pages, status_filter),
-        )
+        posts_page, total = await repo.page_by_author(user_id, status=status, limit=POSTS_PER_PAGE)
+    
+    if not total:
+        await callback.message.edit_text(_EMPTY_LIST_TEXT.get(status_filter, _EMPTY_LIST_TEXT["all"]))
         await callback.answer()
+        return
+    
+    total_pages = (total + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
+    filter_title = _FILTER_TITLE.get(status_filter, "Посты")
+    
+    await callback.message.edit_text(
+        f"📋 <b>{filter_title}</b> ({total} шт.)\n\n"
+        "Выберите пост для просмотра:",
+        reply_markup=posts_list_keyboard(posts_page, 0, total_pages, status_filter),
+    )
+    await callback.answer()
 
 
-@router.callback_query(F.data == "posts_noop")
+@router.callback_query(F.data.startswith("posts_noop"))
 async def handle_noop(callback: CallbackQuery) -> None:
     """Handle noop callback (page indicator)."""
     await callback.answer()
@@ -367,98 +439,91 @@ async def handle_back_to_list(callback: CallbackQuery) -> None:
     """Go back to posts list."""
     user_id = callback.from_user.id
     
-    async with get_session() as session:
+    async with get_read_session() as session:
         repo = DraftPostRepository(session)
-        all_posts = await repo.get_by_author(user_id, limit=100)
-        
-        if not all_posts:
-            await callback.message.edit_text(
-                "📋 <b>Ваши посты</b>\n\n"
-                "<i>У вас нет постов.</i>\n\n"
-                "Создайте новый пост командой /new"
-            )
-            await callback.answer()
-            return
-        
-        total_pages = (len(all_posts) + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
-        posts_page = all_posts[:POSTS_PER_PAGE]
-        
-        await callback.message.edit_text(
-            f"📋 <b>Все посты</b> ({len(all_posts)} шт.)\n\n"
-            "Выберите пост для просмотра:",
-            reply_markup=posts_list_keyboard(posts_page, 0, total_pages, "all"),
-        )
+        posts_page, total = await repo.page_by_author(user_id, limit=POSTS_PER_PAGE)
+    
+    if not total:
+        await callback.message.edit_text(_EMPTY_LIST_TEXT["all"])
         await callback.answer()
+        return
+    
+    total_pages = (total + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
+    
+    await callback.message.edit_text(
+        f"📋 <b>Все посты</b> ({total} шт.)\n\n"
+        "Выберите пост для просмотра:",
+        reply_markup=posts_list_keyboard(posts_page, 0, total_pages, "all"),
+    )
+    await callback.answer()
 
 
 # =============================================================================
 # View post
 # =============================================================================
 
-@router.callback_query(F.data.startswith("post_view_"))
-async def view_post(callback: CallbackQuery) -> None:
+def _render_post_info(post) -> str:
+    """Render the post details shown by view_post."""
+    status_text = _STATUS_TEXT.get(post.status, post.status)
+    
+    text_preview = post.text[:200] + "..." if post.text and len(post.text) > 200 else (post.text or "<без текста>")
+    
+    # Optional lines carry their own leading newline so absent ones vanish
+    scheduled = f"\n<b>Запланирован:</b> {format_datetime(post.scheduled_at)}" if post.scheduled_at else ""
+    published = f"\n<b>Опубликован:</b> {format_datetime(post.published_at)}" if post.published_at else ""
+    message_id = (
+        f"\n<b>ID сообщения:</b> <code>{post.published_message_id}</code>"
+        if post.published_message_id else ""
+    )
+    
+    buttons = post.buttons
+    buttons_block = ""
+    if buttons:
+        buttons_text = "\n".join([f"  • {btn.text}" for btn in buttons[:3]])
+        if len(buttons) > 3:
+            buttons_text += f"\n  ... и ещё {len(buttons) - 3}"
+        buttons_block = f"\n\n<b>Кнопки:</b>\n{buttons_text}"
+    
+    return (
+        f"📋 <b>Пост #{post.id}</b>\n\n"
+        f"<b>Статус:</b> {status_text}\n"
+        f"<b>Создан:</b> {format_datetime(post.created_at)}"
+        f"{scheduled}{published}{message_id}\n\n"
+        f"<b>Медиа:</b> {len(post.media)} файл(ов)\n"
+        f"<b>Кнопок:</b> {len(buttons)}"
+        f"{buttons_block}\n\n"
+        f"<b>Текст:</b>\n<i>{text_preview}</i>"
+    )
+
+
+@router.callback_query(post_id_filter(_CB_POST_VIEW))
+async def view_post(callback: CallbackQuery, match: re.Match) -> None:
     """View post details."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
-    async with get_session() as session:
-        repo = DraftPostRepository(session)
-        post = await repo.get_by_id(post_id)
-        
-        if not post:
-            await callback.answer("Пост не найден", show_alert=True)
-            return
-        
-        # Build post info
-        status_text = {
-            PostStatus.DRAFT.value: "📝 Черновик",
-            PostStatus.SCHEDULED.value: "⏰ Запланирован",
-            PostStatus.PUBLISHED.value: "✅ Опубликован",
-            PostStatus.FAILED.value: "❌ Ошибка публикации",
-        }.get(post.status, post.status)
-        
-        text_preview = post.text[:200] + "..." if post.text and len(post.text) > 200 else (post.text or "<без текста>")
-        
-        info_parts = [
-            f"📋 <b>Пост #{post.id}</b>\n",
-            f"<b>Статус:</b> {status_text}",
-            f"<b>Создан:</b> {format_datetime(post.created_at)}",
-        ]
-        
-        if post.scheduled_at:
-            info_parts.append(f"<b>Запланирован:</b> {format_datetime(post.scheduled_at)}")
-        
-        if post.published_at:
-            info_parts.append(f"<b>Опубликован:</b> {format_datetime(post.published_at)}")
-        
-        if post.published_message_id:
-            info_parts.append(f"<b>ID сообщения:</b> <code>{post.published_message_id}</code>")
-        
-        info_parts.append(f"\n<b>Медиа:</b> {len(post.media)} файл(ов)")
-        info_parts.append(f"<b>Кнопок:</b> {len(post.buttons)}")
-        
-        if post.buttons:
-            buttons_text = "\n".join([f"  • {btn.text}" for btn in post.buttons[:3]])
-            if len(post.buttons) > 3:
-                buttons_text += f"\n  ... и ещё {len(post.buttons) - 3}"
-            info_parts.append(f"\n<b>Кнопки:</b>\n{buttons_text}")
-        
-        info_parts.append(f"\n<b>Текст:</b>\n<i>{text_preview}</i>")
-        
-        await callback.message.edit_text(
-            "\n".join(info_parts),
-            reply_markup=post_view_keyboard(post),
-        )
-        await callback.answer()
+    async with get_read_session() as session:
+        post = await DraftPostRepository(session).get_by_id(post_id)
+    
+    # Relations are eager-loaded, so the post renders after the session closes
+    if not post:
+        await callback.answer("Пост не найден", show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        _render_post_info(post),
+        reply_markup=post_view_keyboard(post),
+    )
+    await callback.answer()
 
 
 # =============================================================================
 # Post actions
 # =============================================================================
 
-@router.callback_query(F.data.startswith("post_edit_"))
-async def start_edit_post(callback: CallbackQuery) -> None:
+@router.callback_query(post_id_filter(_CB_POST_EDIT))
+async def start_edit_post(callback: CallbackQuery, match: re.Match) -> None:
     """Redirect to edit post."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
     await callback.message.edit_text(
         f"✏️ Для редактирования поста используйте команду:\n\n"
@@ -467,125 +532,142 @@ async def start_edit_post(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("post_delete_"))
-async def delete_post(callback: CallbackQuery) -> None:
+@router.callback_query(post_id_filter(_CB_POST_DELETE))
+async def delete_post(callback: CallbackQuery, match: re.Match) -> None:
     """Delete a draft post."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
     async with get_session() as session:
         repo = DraftPostRepository(session)
         post = await repo.get_by_id(post_id)
         
-        if not post:
-            await callback.answer("Пост не найден", show_alert=True)
-            return
-        
-        if post.status == PostStatus.PUBLISHED.value:
-            await callback.answer("Нельзя удалить опубликованный пост", show_alert=True)
-            return
-        
-        await repo.delete(post_id)
-        
-        await callback.message.edit_text(
-            f"🗑 Пост #{post_id} удалён."
-        )
-        await callback.answer("Удалено")
-        
-        logger.info(f"User {callback.from_user.id} deleted post {post_id}")
+        if post and post.status not in (_ST_PUBLISHED, _ST_PUBLISHING):
+            await repo.delete(post_id)
+    
+    if not post:
+        await callback.answer("Пост не найден", show_alert=True)
+        return
+    
+    if post.status == _ST_PUBLISHED:
+        await callback.answer("Нельзя удалить опубликованный пост", show_alert=True)
+        return
+    
+    if post.status == _ST_PUBLISHING:
+        await callback.answer("Пост сейчас публикуется, удалить его нельзя", show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        f"🗑 Пост #{post_id} удалён."
+    )
+    await callback.answer("Удалено")
+    
+    logger.info(f"User {callback.from_user.id} deleted post {post_id}")
 
 
-@router.callback_query(F.data.startswith("post_publish_"))
-async def publish_post_now(callback: CallbackQuery) -> None:
+@router.callback_query(post_id_filter(_CB_POST_PUBLISH))
+async def publish_post_now(callback: CallbackQuery, match: re.Match) -> None:
     """Publish post immediately."""
-    from app.services.publishing import publish_post
-    from datetime import timezone
-    
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
     await callback.answer("⏳ Публикую...")
     
     async with get_session() as session:
         repo = DraftPostRepository(session)
-        post = await repo.get_by_id(post_id)
-        
-        if not post:
-            await callback.message.edit_text("❌ Пост не найден.")
-            return
-        
-        if post.status == PostStatus.PUBLISHED.value:
-            await callback.message.edit_text("⚠️ Пост уже опубликован.")
-            return
-        
+        post = await repo.claim_for_publishing(post_id)
+        exists = post is not None or await repo.get_by_id(post_id) is not None
+    
+    if not exists:
+        await callback.message.edit_text("❌ Пост не найден.")
+        return
+    
+    if post is None:
+        # Already published, or another click is publishing it right now
+        await callback.message.edit_text("⚠️ Пост уже опубликован.")
+        return
+    
+    try:
         # Cancel scheduled job if exists
         if post.scheduler_job_id:
-            from app.services.scheduler import cancel_scheduled_post
             await cancel_scheduled_post(post.scheduler_job_id)
         
+        # Publish without holding a database connection during the Telegram calls
         message_id = await publish_post(post)
         
-        if message_id:
-            await repo.mark_published(
-                post_id=post_id,
-                message_id=message_id,
-                published_at=datetime.now(timezone.utc),
-            )
-            
-            await callback.message.edit_text(
-                f"✅ <b>Пост #{post_id} опубликован!</b>\n\n"
-                f"ID сообщения: <code>{message_id}</code>"
-            )
-            logger.info(f"User {callback.from_user.id} published post {post_id}")
-        else:
-            await repo.mark_failed(post_id)
-            await callback.message.edit_text(
-                f"❌ <b>Ошибка публикации поста #{post_id}</b>\n\n"
-                "Проверьте, что бот является администратором канала."
-            )
+        async with get_session() as session:
+            repo = DraftPostRepository(session)
+            if message_id:
+                await repo.mark_published(
+                    post_id=post_id,
+                    message_id=message_id,
+                    published_at=datetime.now(timezone.utc),
+                )
+            else:
+                await repo.mark_failed(post_id)
+    except Exception:
+        # Never leave a claimed post stuck in PUBLISHING
+        logger.exception(f"Failed to publish post {post_id}")
+        message_id = None
+        async with get_session() as session:
+            await DraftPostRepository(session).mark_failed(post_id)
+    
+    if message_id:
+        await callback.message.edit_text(
+            f"✅ <b>Пост #{post_id} опубликован!</b>\n\n"
+            f"ID сообщения: <code>{message_id}</code>"
+        )
+        logger.info(f"User {callback.from_user.id} published post {post_id}")
+    else:
+        await callback.message.edit_text(
+            f"❌ <b>Ошибка публикации поста #{post_id}</b>\n\n"
+            "Проверьте, что бот является администратором канала."
+        )
 
 
-@router.callback_query(F.data.startswith("post_unschedule_"))
-async def unschedule_post(callback: CallbackQuery) -> None:
+@router.callback_query(post_id_filter(_CB_POST_UNSCHEDULE))
+async def unschedule_post(callback: CallbackQuery, match: re.Match) -> None:
     """Cancel scheduled post."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
+    unscheduled = False
     async with get_session() as session:
         repo = DraftPostRepository(session)
         post = await repo.get_by_id(post_id)
         
-        if not post:
-            await callback.answer("Пост не найден", show_alert=True)
-            return
-        
-        if post.status != PostStatus.SCHEDULED.value:
-            await callback.answer("Пост не запланирован", show_alert=True)
-            return
-        
-        # Cancel scheduler job
-        if post.scheduler_job_id:
-            from app.services.scheduler import cancel_scheduled_post
-            await cancel_scheduled_post(post.scheduler_job_id)
-        
-        # Update status to draft
-        await repo.update(
-            post_id,
-            status=PostStatus.DRAFT.value,
-            scheduled_at=None,
-            scheduler_job_id=None,
-        )
-        
-        await callback.message.edit_text(
-            f"✅ Публикация поста #{post_id} отменена.\n"
-            "Пост сохранён как черновик."
-        )
-        await callback.answer("Отменено")
-        
-        logger.info(f"User {callback.from_user.id} unscheduled post {post_id}")
+        if post and post.status == _ST_SCHEDULED:
+            # Cancel scheduler job
+            if post.scheduler_job_id:
+                await cancel_scheduled_post(post.scheduler_job_id)
+            
+            # Update status to draft
+            await repo.update(
+                post_id,
+                status=_ST_DRAFT,
+                scheduled_at=None,
+                scheduler_job_id=None,
+            )
+            unscheduled = True
+    
+    if not post:
+        await callback.answer("Пост не найден", show_alert=True)
+        return
+    
+    if not unscheduled:
+        await callback.answer("Пост не запланирован", show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        f"✅ Публикация поста #{post_id} отменена.\n"
+        "Пост сохранён как черновик."
+    )
+    await callback.answer("Отменено")
+    
+    logger.info(f"User {callback.from_user.id} unscheduled post {post_id}")
 
 
-@router.callback_query(F.data.startswith("post_schedule_"))
-async def schedule_post_prompt(callback: CallbackQuery) -> None:
+@router.callback_query(post_id_filter(_CB_POST_SCHEDULE))
+async def schedule_post_prompt(callback: CallbackQuery, match: re.Match) -> None:
     """Prompt to schedule post."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
     await callback.message.edit_text(
         f"⏰ <b>Планирование поста #{post_id}</b>\n\n"
@@ -1,9 +1,16 @@
 """Edit published posts handlers."""
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional, List
+import re
+from functools import lru_cache
+from html import escape
+from typing import Dict, Iterable, Optional, Set, Tuple
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
@@ -15,16 +22,40 @@ from aiogram.types import (
 )
 
 from app.bot import bot
-from app.config import get_settings
+from app.config import settings
 from app.db.models import PostStatus
 from app.db.repo import DraftPostRepository, DraftButtonRepository
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
 from app.keyboards.inline import cancel_keyboard
+from app.routers.post_wizard import entities_to_list
+from app.services.publishing import list_to_entities
+from app.utils.telegram import button_id_filter, parse_button_text, post_id_filter
 
 logger = logging.getLogger(__name__)
 
 router = Router(name="edit_published")
 
+# Button changes to one post within this window (seconds) are pushed to the
+# channel as a single edit, sparing the bot-wide Telegram rate limit
+CHANNEL_UPDATE_DELAY = 0.25
+
+# Delayed channel edit per post ID, see schedule_channel_update()
+_pending_updates: Dict[int, asyncio.Task] = {}
+
+# Strong references to every channel edit task until it finishes; the event
+# loop only keeps weak ones, and replaced tasks leave _pending_updates early
+_update_tasks: Set[asyncio.Task] = set()
+
+
+# Callback data prefixes; builders append the post ID, and button actions
+# then "_<button_id>"
+_CB_EDIT_TEXT = "edit_text_"
+_CB_EDIT_BUTTONS = "edit_buttons_"
+_CB_EDIT_BACK = "edit_back_"
+_CB_ADD_BUTTON = "addbtn_"
+_CB_EDIT_BUTTON = "editbtn_"
+_CB_DELETE_BUTTON = "delbtn_"
+
 
 class EditPost(StatesGroup):
     """States for editing published post."""
@@ -36,35 +67,80 @@ class EditPost(StatesGroup):
     editing_button = State()  # Editing existing button
 
 
+@lru_cache(maxsize=1024)
 def edit_menu_keyboard(post_id: int) -> InlineKeyboardMarkup:
     """Build edit menu keyboard."""
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="✏️ Изменить текст", callback_data=f"edit_text_{post_id}")],
-        [InlineKeyboardButton(text="🔘 Управление кнопками", callback_data=f"edit_buttons_{post_id}")],
+        [InlineKeyboardButton(text="✏️ Изменить текст", callback_data=f"{_CB_EDIT_TEXT}{post_id}")],
+        [InlineKeyboardButton(text="🔘 Управление кнопками", callback_data=f"{_CB_EDIT_BUTTONS}{post_id}")],
         [InlineKeyboardButton(text="❌ Отмена", callback_data="edit_cancel")],
     ])
 
 
-def buttons_menu_keyboard(post_id: int, buttons: list) -> InlineKeyboardMarkup:
+def channel_keyboard(buttons: list) -> Optional[InlineKeyboardMarkup]:
+    """Keyboard for the published channel message, one button per row."""
+    if not buttons:
+        return None
+    return _channel_keyboard(tuple((btn.text, btn.url) for btn in buttons))
+
+
+@lru_cache(maxsize=256)
+def _channel_keyboard(buttons: Tuple[Tuple[str, str], ...]) -> InlineKeyboardMarkup:
+    """Build the markup once per distinct set of buttons."""
+    # Keyed on button content, so edits naturally produce a new entry
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=text, url=url)] for text, url in buttons
+    ])
+
+
+async def render_buttons_menu(message: Message, post) -> None:
+    """Edit ``message`` into the buttons management menu of ``post``."""
+    await message.edit_text(
+        _buttons_menu_text(tuple((btn.text, btn.url) for btn in post.buttons)),
+        reply_markup=buttons_menu_keyboard(post.id, post.buttons),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _buttons_menu_text(buttons: Tuple[Tuple[str, str], ...]) -> str:
+    """Text of the buttons management menu, listing the (text, url) buttons."""
+    if buttons:
+        buttons_text = "\n".join(f"• {text} → {url[:30]}..." for text, url in buttons)
+    else:
+        buttons_text = "<i>Кнопок нет</i>"
+    return (
+        f"🔘 <b>Управление кнопками</b>\n\n"
+        f"<b>Текущие кнопки:</b>\n{buttons_text}\n\n"
+        "Выберите действие:"
+    )
+
+
+def buttons_menu_keyboard(post_id: int, buttons: Iterable) -> InlineKeyboardMarkup:
     """Build buttons management keyboard."""
+    return _buttons_menu_keyboard(post_id, tuple((btn.id, btn.text) for btn in buttons))
+
+
+@lru_cache(maxsize=1024)
+def _buttons_menu_keyboard(post_id: int, buttons: Tuple[Tuple[int, str], ...]) -> InlineKeyboardMarkup:
+    """Build the menu once per post and (id, text) of its buttons."""
     kb = []
     
     # List existing buttons with edit option
-    for i, btn in enumerate(buttons):
+    for btn_id, btn_text in buttons:
         kb.append([
             InlineKeyboardButton(
-                text=f"📝 {btn.text[:20]}..." if len(btn.text) > 20 else f"📝 {btn.text}",
-                callback_data=f"editbtn_{post_id}_{btn.id}"
+                text=f"📝 {btn_text[:20]}..." if len(btn_text) > 20 else f"📝 {btn_text}",
+                callback_data=f"{_CB_EDIT_BUTTON}{post_id}_{btn_id}"
             ),
             InlineKeyboardButton(
                 text="🗑",
-                callback_data=f"delbtn_{post_id}_{btn.id}"
+                callback_data=f"{_CB_DELETE_BUTTON}{post_id}_{btn_id}"
             ),
         ])
     
     # Add new button option
-    kb.append([InlineKeyboardButton(text="➕ Добавить кнопку", callback_data=f"addbtn_{post_id}")])
-    kb.append([InlineKeyboardButton(text="⬅️ Назад", callback_data=f"edit_back_{post_id}")])
+    kb.append([InlineKeyboardButton(text="➕ Добавить кнопку", callback_data=f"{_CB_ADD_BUTTON}{post_id}")])
+    kb.append([InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{_CB_EDIT_BACK}{post_id}")])
     
     return InlineKeyboardMarkup(inline_keyboard=kb)
 
@@ -94,22 +170,17 @@ async def cmd_edit_post(message: Message, state: FSMContext) -> None:
         return
     
     user_id = message.from_user.id
+    is_admin = user_id in settings.admin_ids
     
     async with get_session() as session:
         repo = DraftPostRepository(session)
-        post = await repo.get_by_id(post_id)
+        post = await repo.get_by_id_if_visible(post_id, user_id, is_admin)
         
+        # Other users' posts look missing, so IDs can't be probed
         if not post:
             await message.answer("❌ Пост не найден.")
             return
         
-        if post.author_id != user_id:
-            # Check if user is admin
-            settings = get_settings()
-            if user_id not in settings.admin_ids:
-                await message.answer("❌ У вас нет прав на редактирование этого поста.")
-                return
-        
         if post.status != PostStatus.PUBLISHED.value:
             await message.answer(
                 f"⚠️ Этот пост ещё не опубликован (статус: {post.status}).\n"
@@ -143,10 +214,10 @@ async def cmd_edit_post(message: Message, state: FSMContext) -> None:
 # Edit text
 # =============================================================================
 
-@router.callback_query(StateFilter(EditPost.selecting_action), F.data.startswith("edit_text_"))
-async def start_edit_text(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(StateFilter(EditPost.selecting_action), post_id_filter(_CB_EDIT_TEXT))
+async def start_edit_text(callback: CallbackQuery, state: FSMContext, match: re.Match) -> None:
     """Start editing post text."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
     await state.update_data(edit_post_id=post_id)
     await state.set_state(EditPost.editing_text)
@@ -163,8 +234,6 @@ async def start_edit_text(callback: CallbackQuery, state: FSMContext) -> None:
 @router.message(StateFilter(EditPost.editing_text), F.text)
 async def handle_new_text(message: Message, state: FSMContext) -> None:
     """Handle new text input."""
-    from app.routers.post_wizard import entities_to_list
-    
     data = await state.get_data()
     post_id = data.get("edit_post_id")
     
@@ -181,43 +250,25 @@ async def handle_new_text(message: Message, state: FSMContext) -> None:
             return
         
         # Update in channel
-        settings = get_settings()
         try:
-            # Build keyboard from existing buttons
-            keyboard = None
-            if post.buttons:
-                kb_rows = []
-                for btn in post.buttons:
-                    kb_rows.append([InlineKeyboardButton(text=btn.text, url=btn.url)])
-                keyboard = InlineKeyboardMarkup(inline_keyboard=kb_rows)
+            # Keyboard from existing buttons
+            keyboard = channel_keyboard(post.buttons)
             
-            # Check if post has media
+            # Media posts carry the text as a caption
+            entities = list_to_entities(new_entities)
             if post.media:
-                # Edit caption for media message
-                from aiogram.types import InputMediaPhoto, InputMediaVideo
-                from app.routers.post_wizard import list_to_entities
-                
-                entities = list_to_entities(new_entities)
-                
-                await bot.edit_message_caption(
-                    chat_id=settings.channel_id,
-                    message_id=post.published_message_id,
-                    caption=new_text,
-                    caption_entities=entities,
-                    reply_markup=keyboard,
-                )
+                edit_fn = bot.edit_message_caption
+                edit_kwargs = {"caption": new_text, "caption_entities": entities}
             else:
-                # Edit text message
-                from app.routers.post_wizard import list_to_entities
-                entities = list_to_entities(new_entities)
-                
-                await bot.edit_message_text(
-                    chat_id=settings.channel_id,
-                    message_id=post.published_message_id,
-                    text=new_text,
-                    entities=entities,
-                    reply_markup=keyboard,
-                )
+                edit_fn = bot.edit_message_text
+                edit_kwargs = {"text": new_text, "entities": entities}
+            
+            await edit_fn(
+                chat_id=settings.channel_id,
+                message_id=post.published_message_id,
+                reply_markup=keyboard,
+                **edit_kwargs,
+            )
             
             # Update in database
             await repo.update(post_id, text=new_text, text_entities=new_entities)
@@ -233,7 +284,6 @@ async def handle_new_text(message: Message, state: FSMContext) -> None:
             
         except Exception as e:
             logger.exception(f"Failed to edit post {post_id}: {e}")
-            from html import escape
             await message.answer(
                 f"❌ <b>Ошибка редактирования</b>\n\n"
                 f"<code>{escape(str(e)[:200])}</code>"
@@ -244,40 +294,29 @@ async def handle_new_text(message: Message, state: FSMContext) -> None:
 # Edit buttons
 # =============================================================================
 
-@router.callback_query(StateFilter(EditPost.selecting_action), F.data.startswith("edit_buttons_"))
-async def start_edit_buttons(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(StateFilter(EditPost.selecting_action), post_id_filter(_CB_EDIT_BUTTONS))
+async def start_edit_buttons(callback: CallbackQuery, state: FSMContext, match: re.Match) -> None:
     """Show buttons management menu."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
-    async with get_session() as session:
-        repo = DraftPostRepository(session)
-        post = await repo.get_by_id(post_id)
-        
-        if not post:
-            await callback.answer("Пост не найден", show_alert=True)
-            return
-        
-        await state.update_data(edit_post_id=post_id)
-        await state.set_state(EditPost.editing_buttons)
-        
-        if post.buttons:
-            buttons_text = "\n".join([f"• {btn.text} → {btn.url[:30]}..." for btn in post.buttons])
-        else:
-            buttons_text = "<i>Кнопок нет</i>"
-        
-        await callback.message.edit_text(
-            f"🔘 <b>Управление кнопками</b>\n\n"
-            f"<b>Текущие кнопки:</b>\n{buttons_text}\n\n"
-            "Выберите действие:",
-            reply_markup=buttons_menu_keyboard(post_id, list(post.buttons)),
-        )
-        await callback.answer()
+    async with get_read_session() as session:
+        post = await DraftPostRepository(session).get_by_id(post_id)
+    
+    if not post:
+        await callback.answer("Пост не найден", show_alert=True)
+        return
+    
+    await state.update_data(edit_post_id=post_id)
+    await state.set_state(EditPost.editing_buttons)
+    
+    await render_buttons_menu(callback.message, post)
+    await callback.answer()
 
 
-@router.callback_query(StateFilter(EditPost.editing_buttons), F.data.startswith("addbtn_"))
-async def start_add_button(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(StateFilter(EditPost.editing_buttons), post_id_filter(_CB_ADD_BUTTON))
+async def start_add_button(callback: CallbackQuery, state: FSMContext, match: re.Match) -> None:
     """Start adding new button."""
-    post_id = int(callback.data.split("_")[1])
+    post_id = int(match.group(1))
     
     await state.update_data(edit_post_id=post_id)
     await state.set_state(EditPost.adding_button)
@@ -288,7 +327,7 @@ async def start_add_button(callback: CallbackQuery, state: FSMContext) -> None:
         "<code>Текст кнопки - https://url.com</code>\n\n"
         "💡 <i>Можно добавить несколько кнопок, каждую на новой строке</i>",
         reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="⬅️ Назад", callback_data=f"edit_buttons_{post_id}")],
+            [InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{_CB_EDIT_BUTTONS}{post_id}")],
         ]),
     )
     await callback.answer()
@@ -297,8 +336,6 @@ async def start_add_button(callback: CallbackQuery, state: FSMContext) -> None:
 @router.message(StateFilter(EditPost.adding_button), F.text)
 async def handle_add_button(message: Message, state: FSMContext) -> None:
     """Handle new button input."""
-    from app.utils.telegram import parse_button_text
-    
     data = await state.get_data()
     post_id = data.get("edit_post_id")
     
@@ -312,89 +349,73 @@ async def handle_add_button(message: Message, state: FSMContext) -> None:
         return
     
     async with get_session() as session:
-        repo = DraftPostRepository(session)
         btn_repo = DraftButtonRepository(session)
-        post = await repo.get_by_id(post_id)
         
-        if not post:
-            await message.answer("❌ Пост не найден.")
-            await state.clear()
-            return
-        
-        # Get current max row
-        current_buttons = list(post.buttons)
-        max_row = max([b.row for b in current_buttons], default=-1)
-        
-        # Add new buttons
-        for i, (btn_text, btn_url) in enumerate(new_buttons):
-            await btn_repo.add_button(
-                post_id=post_id,
-                text=btn_text,
-                url=btn_url,
-                row=max_row + 1 + i,
-                position=0,
-            )
-        
-        # Update message in channel
-        await _update_channel_buttons(session, post_id)
-        
-        await message.answer(
-            f"✅ Добавлено кнопок: {len(new_buttons)}",
-        )
-        
-        # Refresh post and show buttons menu
-        post = await repo.get_by_id(post_id)
-        await state.set_state(EditPost.editing_buttons)
-        
-        await message.answer(
-            "🔘 <b>Управление кнопками</b>",
-            reply_markup=buttons_menu_keyboard(post_id, list(post.buttons)),
-        )
-        
-        logger.info(f"User {message.from_user.id} added {len(new_buttons)} buttons to post {post_id}")
+        # Aggregate in SQL rather than loading the post with all its buttons
+        next_row = await btn_repo.next_row(post_id)
+        if next_row is not None:
+            # Add new buttons in one INSERT, one per row after the current ones
+            await btn_repo.add_buttons_bulk(post_id, new_buttons, start_row=next_row)
+            post = await DraftPostRepository(session).get_by_id(post_id)
+    
+    if next_row is None:
+        await message.answer("❌ Пост не найден.")
+        await state.clear()
+        return
+    
+    # Update message in channel once the new buttons are committed
+    schedule_channel_update(post_id)
+    
+    await message.answer(
+        f"✅ Добавлено кнопок: {len(new_buttons)}",
+    )
+    
+    # Show buttons menu
+    await state.set_state(EditPost.editing_buttons)
+    
+    await message.answer(
+        "🔘 <b>Управление кнопками</b>",
+        reply_markup=buttons_menu_keyboard(post_id, post.buttons),
+    )
+    
+    logger.info(f"User {message.from_user.id} added {len(new_buttons)} buttons to post {post_id}")
 
 
-@router.callback_query(StateFilter(EditPost.editing_buttons), F.data.startswith("editbtn_"))
-async def start_edit_button(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(StateFilter(EditPost.editing_buttons), button_id_filter(_CB_EDIT_BUTTON))
+async def start_edit_button(callback: CallbackQuery, state: FSMContext, match: re.Match) -> None:
     """Start editing existing button."""
-    parts = callback.data.split("_")
-    post_id = int(parts[1])
-    button_id = int(parts[2])
+    post_id, button_id = int(match.group(1)), int(match.group(2))
     
-    async with get_session() as session:
-        btn_repo = DraftButtonRepository(session)
-        buttons = await btn_repo.get_by_post(post_id)
-        button = next((b for b in buttons if b.id == button_id), None)
-        
-        if not button:
-            await callback.answer("Кнопка не найдена", show_alert=True)
-            return
-        
-        await state.update_data(
-            edit_post_id=post_id,
-            edit_button_id=button_id,
-        )
-        await state.set_state(EditPost.editing_button)
-        
-        await callback.message.edit_text(
-            f"📝 <b>Редактирование кнопки</b>\n\n"
-            f"<b>Текущий текст:</b> {button.text}\n"
-            f"<b>Текущий URL:</b> {button.url}\n\n"
-            "Отправьте новые данные в формате:\n"
-            "<code>Новый текст - https://new-url.com</code>\n\n"
-            "Или отправьте только URL, чтобы изменить ссылку.",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="⬅️ Назад", callback_data=f"edit_buttons_{post_id}")],
-            ]),
-        )
-        await callback.answer()
+    async with get_read_session() as session:
+        button = await DraftButtonRepository(session).get_by_id(button_id)
+    
+    if not button or button.post_id != post_id:
+        await callback.answer("Кнопка не найдена", show_alert=True)
+        return
+    
+    await state.update_data(
+        edit_post_id=post_id,
+        edit_button_id=button_id,
+    )
+    await state.set_state(EditPost.editing_button)
+    
+    await callback.message.edit_text(
+        f"📝 <b>Редактирование кнопки</b>\n\n"
+        f"<b>Текущий текст:</b> {button.text}\n"
+        f"<b>Текущий URL:</b> {button.url}\n\n"
+        "Отправьте новые данные в формате:\n"
+        "<code>Новый текст - https://new-url.com</code>\n\n"
+        "Или отправьте только URL, чтобы изменить ссылку.",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{_CB_EDIT_BUTTONS}{post_id}")],
+        ]),
+    )
+    await callback.answer()
 
 
 @router.message(StateFilter(EditPost.editing_button), F.text)
 async def handle_edit_button(message: Message, state: FSMContext) -> None:
     """Handle button edit input."""
-    from app.utils.telegram import parse_button_text
-    
     data = await state.get_data()
     post_id = data.get("edit_post_id")
     button_id = data.get("edit_button_id")
@@ -427,71 +448,59 @@ async def handle_edit_button(message: Message, state: FSMContext) -> None:
             update_data["text"] = new_text
         
         await btn_repo.update_button(button_id, **update_data)
-        
-        # Update message in channel
-        await _update_channel_buttons(session, post_id)
-        
-        await message.answer("✅ Кнопка обновлена!")
-        
-        # Show buttons menu
-        repo = DraftPostRepository(session)
-        post = await repo.get_by_id(post_id)
-        await state.set_state(EditPost.editing_buttons)
-        
-        await message.answer(
-            "🔘 <b>Управление кнопками</b>",
-            reply_markup=buttons_menu_keyboard(post_id, list(post.buttons)),
-        )
-        
-        logger.info(f"User {message.from_user.id} edited button {button_id} of post {post_id}")
+        post = await DraftPostRepository(session).get_by_id(post_id)
+    
+    # Update message in channel once the change is committed
+    schedule_channel_update(post_id)
+    
+    await message.answer("✅ Кнопка обновлена!")
+    
+    # Show buttons menu
+    await state.set_state(EditPost.editing_buttons)
+    
+    await message.answer(
+        "🔘 <b>Управление кнопками</b>",
+        reply_markup=buttons_menu_keyboard(post_id, post.buttons),
+    )
+    
+    logger.info(f"User {message.from_user.id} edited button {button_id} of post {post_id}")
 
 
-@router.callback_query(StateFilter(EditPost.editing_buttons), F.data.startswith("delbtn_"))
-async def delete_button(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(StateFilter(EditPost.editing_buttons), button_id_filter(_CB_DELETE_BUTTON))
+async def delete_button(callback: CallbackQuery, state: FSMContext, match: re.Match) -> None:
     """Delete a button."""
-    parts = callback.data.split("_")
-    post_id = int(parts[1])
-    button_id = int(parts[2])
+    post_id, button_id = int(match.group(1)), int(match.group(2))
     
     async with get_session() as session:
         btn_repo = DraftButtonRepository(session)
         deleted = await btn_repo.delete_button(button_id)
-        
         if deleted:
-            # Update message in channel
-            await _update_channel_buttons(session, post_id)
-            await callback.answer("✅ Кнопка удалена")
-        else:
-            await callback.answer("❌ Кнопка не найдена", show_alert=True)
-            return
-        
-        # Refresh buttons menu
-        repo = DraftPostRepository(session)
-        post = await repo.get_by_id(post_id)
-        
-        if post.buttons:
-            buttons_text = "\n".join([f"• {btn.text} → {btn.url[:30]}..." for btn in post.buttons])
-        else:
-            buttons_text = "<i>Кнопок нет</i>"
-        
-        await callback.message.edit_text(
-            f"🔘 <b>Управление кнопками</b>\n\n"
-            f"<b>Текущие кнопки:</b>\n{buttons_text}\n\n"
-            "Выберите действие:",
-            reply_markup=buttons_menu_keyboard(post_id, list(post.buttons)),
-        )
-        
-        logger.info(f"User {callback.from_user.id} deleted button {button_id} from post {post_id}")
+            post = await DraftPostRepository(session).get_by_id(post_id)
+    
+    if not deleted:
+        await callback.answer("❌ Кнопка не найдена", show_alert=True)
+        return
+    
+    # Update message in channel once the deletion is committed
+    schedule_channel_update(post_id)
+    
+    # Refresh buttons menu; the toast and the menu edit are independent requests
+    await asyncio.gather(
+        callback.answer("✅ Кнопка удалена"),
+        render_buttons_menu(callback.message, post),
+    )
+    
+    logger.info(f"User {callback.from_user.id} deleted button {button_id} from post {post_id}")
 
 
 # =============================================================================
 # Navigation
 # =============================================================================
 
-@router.callback_query(F.data.startswith("edit_back_"))
-async def back_to_edit_menu(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(post_id_filter(_CB_EDIT_BACK))
+async def back_to_edit_menu(callback: CallbackQuery, state: FSMContext, match: re.Match) -> None:
     """Go back to edit menu."""
-    post_id = int(callback.data.split("_")[2])
+    post_id = int(match.group(1))
     
     async with get_session() as session:
         repo = DraftPostRepository(session)
@@ -529,50 +538,75 @@ async def cancel_edit(callback: CallbackQuery, state: FSMContext) -> None:
 # Helper functions
 # =============================================================================
 
-async def _update_channel_buttons(session, post_id: int) -> bool:
-    """Update buttons on the published message in channel."""
-    repo = DraftPostRepository(session)
-    post = await repo.get_by_id(post_id)
+def schedule_channel_update(post_id: int) -> None:
+    """Refresh the post's buttons in the channel after CHANNEL_UPDATE_DELAY.
     
+    A newer call for the same post replaces the pending one, so a burst of
+    button edits ends in one Telegram edit with the final buttons. Call it
+    after the changes are committed.
+    """
+    pending = _pending_updates.get(post_id)
+    if pending is not None:
+        pending.cancel()
+    task = asyncio.create_task(_delayed_channel_update(post_id))
+    _pending_updates[post_id] = task
+    _update_tasks.add(task)
+    task.add_done_callback(_update_tasks.discard)
+
+
+async def _delayed_channel_update(post_id: int) -> None:
+    """Wait out the coalescing window, then edit the channel message."""
+    try:
+        await asyncio.sleep(CHANNEL_UPDATE_DELAY)
+        async with get_read_session() as session:
+            post = await DraftPostRepository(session).get_by_id(post_id)
+        await _update_channel_buttons(post_id, post)
+    except Exception:
+        # Nobody awaits this task, so log here rather than lose the error
+        logger.exception(f"Failed to update buttons of post {post_id} in channel")
+    finally:
+        if _pending_updates.get(post_id) is asyncio.current_task():
+            del _pending_updates[post_id]
+
+
+async def flush_channel_updates() -> None:
+    """Wait for pending channel edits, e.g. before shutdown."""
+    if _update_tasks:
+        await asyncio.gather(*_update_tasks, return_exceptions=True)
+
+
+def _keyboard_hash(buttons) -> str:
+    """Fingerprint of the channel keyboard built from ``buttons``."""
+    payload = json.dumps([[btn.text, btn.url] for btn in buttons], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+async def _update_channel_buttons(post_id: int, post) -> bool:
+    """Update buttons on the published message in channel."""
     if not post or not post.published_message_id:
         return False
     
-    settings = get_settings()
-    
-    # Build new keyboard
-    keyboard = None
-    if post.buttons:
-        kb_rows = []
-        for btn in post.buttons:
-            kb_rows.append([InlineKeyboardButton(text=btn.text, url=btn.url)])
-        keyboard = InlineKeyboardMarkup(inline_keyboard=kb_rows)
+    # Edits that end where they started (e.g. delete then re-add a button)
+    # would only spend a rate-limit slot on "message is not modified"
+    keyboard_hash = _keyboard_hash(post.buttons)
+    if keyboard_hash == post.published_keyboard_hash:
+        return True
     
+    # Only the keyboard changed, so leave the text or caption untouched
     try:
-        if post.media:
-            # For media messages, edit caption with new keyboard
-            from app.routers.post_wizard import list_to_entities
-            entities = list_to_entities(post.text_entities)
-            
-            await bot.edit_message_caption(
-                chat_id=settings.channel_id,
-                message_id=post.published_message_id,
-                caption=post.text,
-                caption_entities=entities,
-                reply_markup=keyboard,
-            )
-        else:
-            # For text messages
-            from app.routers.post_wizard import list_to_entities
-            entities = list_to_entities(post.text_entities)
-            
-            await bot.edit_message_text(
-                chat_id=settings.channel_id,
-                message_id=post.published_message_id,
-                text=post.text,
-                entities=entities,
-                reply_markup=keyboard,
-            )
-        return True
+        await bot.edit_message_reply_markup(
+            chat_id=settings.channel_id,
+            message_id=post.published_message_id,
+            reply_markup=channel_keyboard(post.buttons),
+        )
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"Failed to update channel buttons for post {post_id}: {e}")
+            return False
     except Exception as e:
         logger.error(f"Failed to update channel buttons for post {post_id}: {e}")
         return False
+    
+    async with get_session() as session:
+        await DraftPostRepository(session).update(post_id, published_keyboard_hash=keyboard_hash)
+    return True
@@ -1,8 +1,11 @@
 """Post creation wizard with FSM."""
 
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Optional, List, Tuple
+from functools import lru_cache
+from html import escape
+from typing import Optional, List, Sequence, Tuple, Union
 
 from aiogram import F, Router
 from aiogram.filters import Command, StateFilter
@@ -13,6 +16,8 @@ from aiogram.types import (
     CallbackQuery,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
+    InputMediaPhoto,
+    InputMediaVideo,
     MessageEntity,
 )
 
@@ -21,8 +26,10 @@ from app.keyboards.inline import cancel_keyboard
 from app.db.models import PostStatus
 from app.db.repo import create_post_with_relations, DraftPostRepository
 from app.db.session import get_session
-from app.services.publishing import publish_post
+from app.services.datetime_parse import format_datetime, parse_datetime
+from app.services.publishing import list_to_entities, publish_post
 from app.services.scheduler import schedule_post
+from app.utils.telegram import parse_button_text
 
 logger = logging.getLogger(__name__)
 
@@ -43,13 +50,24 @@ class PostWizard(StatesGroup):
 # Helper functions
 # =============================================================================
 
+# Single-media preview senders and their file parameter; unknown types
+# are sent as a photo
+_MEDIA_SENDERS = {
+    "photo": (bot.send_photo, "photo"),
+    "video": (bot.send_video, "video"),
+    "document": (bot.send_document, "document"),
+    "animation": (bot.send_animation, "animation"),
+}
+
+
+@lru_cache(maxsize=64)
 def wizard_keyboard(
     next_step: str = None,
     show_skip: bool = False,
     show_done: bool = False,
     show_preview: bool = False,
 ) -> InlineKeyboardMarkup:
-    """Build wizard navigation keyboard."""
+    """Build wizard navigation keyboard (cached, shared between users)."""
     buttons = []
 
     if show_preview:
@@ -86,32 +104,56 @@ def entities_to_list(entities: Optional[tuple]) -> Optional[List[dict]]:
     return result
 
 
-def list_to_entities(data: Optional[List[dict]]) -> Optional[List[MessageEntity]]:
-    """Convert serialized list back to MessageEntity objects."""
-    if not data:
-        return None
-    result = []
-    for item in data:
-        result.append(MessageEntity(
-            type=item["type"],
-            offset=item["offset"],
-            length=item["length"],
-            url=item.get("url"),
-            language=item.get("language"),
-            custom_emoji_id=item.get("custom_emoji_id"),
-        ))
-    return result
+async def _save_and_preview(
+    message: Message,
+    state: FSMContext,
+    *,
+    text: str,
+    entities: Optional[List[MessageEntity]],
+    media_type: Optional[str] = None,
+    media_file_ids: Optional[List[str]] = None,
+) -> None:
+    """Save newly sent content to the wizard state and show its preview."""
+    media_file_ids = media_file_ids or []
+
+    async def _preview() -> None:
+        await message.answer("👁 <b>Превью поста:</b>")
+        # The message's own entities, no need to rebuild the stored dicts
+        await send_post_preview(
+            chat_id=message.chat.id,
+            text=text,
+            text_entities=entities,
+            media_file_ids=media_file_ids,
+            media_type=media_type,
+            buttons=[],
+        )
+
+    # Neither the FSM write nor the preview waits for the other
+    await asyncio.gather(
+        state.update_data(
+            text=text,
+            text_entities=entities_to_list(entities),
+            media_type=media_type,
+            media_file_ids=media_file_ids,
+            buttons=[],
+        ),
+        _preview(),
+    )
 
 
 async def send_post_preview(
     chat_id: int,
     text: Optional[str],
-    text_entities: Optional[List[dict]],
+    text_entities: Optional[Sequence[Union[dict, MessageEntity]]],
     media_file_ids: List[str],
     media_type: Optional[str],
     buttons: List[Tuple[str, str]],
 ) -> Optional[Message]:
-    """Send actual post preview to user with preserved entities (custom emoji)."""
+    """Send actual post preview to user with preserved entities (custom emoji).
+
+    ``text_entities`` is either the stored list of dicts or, straight from
+    an incoming message, its MessageEntity objects.
+    """
     # Build inline keyboard from buttons
     keyboard = None
     if buttons:
@@ -120,8 +162,11 @@ async def send_post_preview(
             kb_rows.append([InlineKeyboardButton(text=btn_text, url=btn_url)])
         keyboard = InlineKeyboardMarkup(inline_keyboard=kb_rows)
 
-    # Convert entities from stored format
-    entities = list_to_entities(text_entities)
+    # Convert entities from stored format; live ones are used as they are
+    if text_entities and isinstance(text_entities[0], dict):
+        entities = list_to_entities(text_entities)
+    else:
+        entities = list(text_entities) if text_entities else None
 
     try:
         # No media - text only
@@ -139,51 +184,16 @@ async def send_post_preview(
         if len(media_file_ids) == 1:
             file_id = media_file_ids[0]
 
-            # For methods that use specific parameter name
-            if media_type == "photo":
-                return await bot.send_photo(
-                    chat_id=chat_id,
-                    photo=file_id,
-                    caption=text,
-                    caption_entities=entities,
-                    reply_markup=keyboard,
-                )
-            elif media_type == "video":
-                return await bot.send_video(
-                    chat_id=chat_id,
-                    video=file_id,
-                    caption=text,
-                    caption_entities=entities,
-                    reply_markup=keyboard,
-                )
-            elif media_type == "document":
-                return await bot.send_document(
-                    chat_id=chat_id,
-                    document=file_id,
-                    caption=text,
-                    caption_entities=entities,
-                    reply_markup=keyboard,
-                )
-            elif media_type == "animation":
-                return await bot.send_animation(
-                    chat_id=chat_id,
-                    animation=file_id,
-                    caption=text,
-                    caption_entities=entities,
-                    reply_markup=keyboard,
-                )
-            else:
-                return await bot.send_photo(
-                    chat_id=chat_id,
-                    photo=file_id,
-                    caption=text,
-                    caption_entities=entities,
-                    reply_markup=keyboard,
-                )
+            send_method, media_param = _MEDIA_SENDERS.get(media_type, _MEDIA_SENDERS["photo"])
+            return await send_method(
+                chat_id=chat_id,
+                **{media_param: file_id},
+                caption=text,
+                caption_entities=entities,
+                reply_markup=keyboard,
+            )
 
         # Multiple media - media group (buttons sent separately)
-        from aiogram.types import InputMediaPhoto, InputMediaVideo
-
         media_list = []
         for i, file_id in enumerate(media_file_ids):
             caption = text if i == 0 else None
@@ -254,28 +264,10 @@ async def cmd_new_post(message: Message, state: FSMContext) -> None:
 async def handle_text_content(message: Message, state: FSMContext) -> None:
     """Handle plain text message."""
     text = message.text
-    entities = entities_to_list(message.entities)
     user_id = message.from_user.id if message.from_user else "unknown"
     logger.info(f"[content] User {user_id} sent text: {repr(text)[:50]}, entities: {len(message.entities or [])}")
 
-    await state.update_data(
-        text=text,
-        text_entities=entities,
-        media_type=None,
-        media_file_ids=[],
-        buttons=[],
-    )
-
-    # Show preview
-    await message.answer("👁 <b>Превью поста:</b>")
-    await send_post_preview(
-        chat_id=message.chat.id,
-        text=text,
-        text_entities=entities,
-        media_file_ids=[],
-        media_type=None,
-        buttons=[],
-    )
+    await _save_and_preview(message, state, text=text, entities=message.entities)
 
     await _ask_for_buttons(message, state)
 
@@ -285,28 +277,17 @@ async def handle_photo_content(message: Message, state: FSMContext) -> None:
     """Handle photo message."""
     user_id = message.from_user.id if message.from_user else "unknown"
     caption = message.caption or ""
-    caption_entities = entities_to_list(message.caption_entities)
     photo = message.photo[-1]
 
     logger.info(f"[content] User {user_id} sent photo with caption: {repr(caption)[:50]}, entities: {len(message.caption_entities or [])}")
 
-    await state.update_data(
+    await _save_and_preview(
+        message,
+        state,
         text=caption,
-        text_entities=caption_entities,
+        entities=message.caption_entities,
         media_type="photo",
         media_file_ids=[photo.file_id],
-        buttons=[],
-    )
-
-    # Show preview
-    await message.answer("👁 <b>Превью поста:</b>")
-    await send_post_preview(
-        chat_id=message.chat.id,
-        text=caption,
-        text_entities=caption_entities,
-        media_file_ids=[photo.file_id],
-        media_type="photo",
-        buttons=[],
     )
 
     await _ask_for_more_media(message, state)
@@ -316,25 +297,15 @@ async def handle_photo_content(message: Message, state: FSMContext) -> None:
 async def handle_video_content(message: Message, state: FSMContext) -> None:
     """Handle video message."""
     caption = message.caption or ""
-    caption_entities = entities_to_list(message.caption_entities)
     video = message.video
 
-    await state.update_data(
+    await _save_and_preview(
+        message,
+        state,
         text=caption,
-        text_entities=caption_entities,
+        entities=message.caption_entities,
         media_type="video",
         media_file_ids=[video.file_id],
-        buttons=[],
-    )
-
-    await message.answer("👁 <b>Превью поста:</b>")
-    await send_post_preview(
-        chat_id=message.chat.id,
-        text=caption,
-        text_entities=caption_entities,
-        media_file_ids=[video.file_id],
-        media_type="video",
-        buttons=[],
     )
 
     await _ask_for_more_media(message, state)
@@ -344,25 +315,15 @@ async def handle_video_content(message: Message, state: FSMContext) -> None:
 async def handle_document_content(message: Message, state: FSMContext) -> None:
     """Handle document message."""
     caption = message.caption or ""
-    caption_entities = entities_to_list(message.caption_entities)
     document = message.document
 
-    await state.update_data(
+    await _save_and_preview(
+        message,
+        state,
         text=caption,
-        text_entities=caption_entities,
+        entities=message.caption_entities,
         media_type="document",
         media_file_ids=[document.file_id],
-        buttons=[],
-    )
-
-    await message.answer("👁 <b>Превью поста:</b>")
-    await send_post_preview(
-        chat_id=message.chat.id,
-        text=caption,
-        text_entities=caption_entities,
-        media_file_ids=[document.file_id],
-        media_type="document",
-        buttons=[],
     )
 
     # Documents don't support albums, go to buttons
@@ -373,25 +334,15 @@ async def handle_document_content(message: Message, state: FSMContext) -> None:
 async def handle_animation_content(message: Message, state: FSMContext) -> None:
     """Handle animation (GIF) message."""
     caption = message.caption or ""
-    caption_entities = entities_to_list(message.caption_entities)
     animation = message.animation
 
-    await state.update_data(
+    await _save_and_preview(
+        message,
+        state,
         text=caption,
-        text_entities=caption_entities,
+        entities=message.caption_entities,
         media_type="animation",
         media_file_ids=[animation.file_id],
-        buttons=[],
-    )
-
-    await message.answer("👁 <b>Превью поста:</b>")
-    await send_post_preview(
-        chat_id=message.chat.id,
-        text=caption,
-        text_entities=caption_entities,
-        media_file_ids=[animation.file_id],
-        media_type="animation",
-        buttons=[],
     )
 
     # Animations don't support albums, go to buttons
@@ -438,26 +389,30 @@ async def _ask_for_buttons(message: Message, state: FSMContext) -> None:
 # Step 2: Additional media (album)
 # =============================================================================
 
-@router.message(StateFilter(PostWizard.waiting_for_more_media), F.photo)
-async def handle_additional_photo(message: Message, state: FSMContext) -> None:
-    """Handle additional photo for album."""
-    photo = message.photo[-1]
+@router.message(StateFilter(PostWizard.waiting_for_more_media), F.photo | F.video)
+async def handle_additional_media(message: Message, state: FSMContext) -> None:
+    """Handle additional photo or video for album."""
     data = await state.get_data()
 
     media_file_ids = data.get("media_file_ids", [])
-    media_file_ids.append(photo.file_id)
+    if message.video:
+        media_file_ids.append(message.video.file_id)
+        media_type, label = "video", "видео"
+    else:
+        media_file_ids.append(message.photo[-1].file_id)
+        media_type, label = data.get("media_type", "photo"), "фото"
 
-    await state.update_data(media_file_ids=media_file_ids)
-    logger.info(f"[more_media] Added photo, total: {len(media_file_ids)}")
+    await state.update_data(media_file_ids=media_file_ids, media_type=media_type)
+    logger.info(f"[more_media] Added {media_type}, total: {len(media_file_ids)}")
 
     # Show updated preview
-    await message.answer(f"✅ Добавлено фото #{len(media_file_ids)}\n\n👁 <b>Превью альбома:</b>")
+    await message.answer(f"✅ Добавлено {label} #{len(media_file_ids)}\n\n👁 <b>Превью альбома:</b>")
     await send_post_preview(
         chat_id=message.chat.id,
         text=data.get("text", ""),
         text_entities=data.get("text_entities"),
         media_file_ids=media_file_ids,
-        media_type="photo",
+        media_type=media_type,
         buttons=[],
     )
 
@@ -472,30 +427,6 @@ async def handle_additional_photo(message: Message, state: FSMContext) -> None:
         )
 
 
-@router.message(StateFilter(PostWizard.waiting_for_more_media), F.video)
-async def handle_additional_video(message: Message, state: FSMContext) -> None:
-    """Handle additional video for album."""
-    video = message.video
-    data = await state.get_data()
-
-    media_file_ids = data.get("media_file_ids", [])
-    media_file_ids.append(video.file_id)
-
-    await state.update_data(media_file_ids=media_file_ids, media_type="video")
-    logger.info(f"[more_media] Added video, total: {len(media_file_ids)}")
-
-    await message.answer(f"✅ Добавлено видео #{len(media_file_ids)}")
-
-    if len(media_file_ids) >= 10:
-        await _ask_for_buttons(message, state)
-    else:
-        await message.answer(
-            f"📎 Всего в альбоме: {len(media_file_ids)} файл(ов)\n"
-            "Отправьте ещё или нажмите «Готово».",
-            reply_markup=wizard_keyboard(next_step="media", show_done=True),
-        )
-
-
 @router.callback_query(StateFilter(PostWizard.waiting_for_more_media), F.data == "wizard_done_media")
 async def done_media_step(callback: CallbackQuery, state: FSMContext) -> None:
     """Finish adding media."""
@@ -511,8 +442,6 @@ async def done_media_step(callback: CallbackQuery, state: FSMContext) -> None:
 @router.message(StateFilter(PostWizard.waiting_for_buttons), F.text)
 async def handle_buttons_input(message: Message, state: FSMContext) -> None:
     """Handle button definitions."""
-    from app.utils.telegram import parse_button_text
-
     text = message.text
     new_buttons = parse_button_text(text)
 
@@ -596,8 +525,6 @@ async def _ask_for_schedule(message: Message, state: FSMContext) -> None:
 @router.message(StateFilter(PostWizard.waiting_for_schedule), F.text)
 async def handle_schedule_input(message: Message, state: FSMContext) -> None:
     """Handle schedule time input."""
-    from app.services.datetime_parse import parse_datetime, format_datetime
-
     text = message.text.strip()
     parsed_dt, error = parse_datetime(text)
 
@@ -750,7 +677,6 @@ async def publish_immediately(callback: CallbackQuery, state: FSMContext) -> Non
                 repo = DraftPostRepository(session)
                 await repo.update(post.id, scheduler_job_id=job_id)
                 
-                from app.services.datetime_parse import format_datetime
                 await callback.message.edit_text(
                     "✅ <b>Пост запланирован!</b>\n\n"
                     f"📝 ID поста: <code>{post.id}</code>\n"
@@ -761,7 +687,6 @@ async def publish_immediately(callback: CallbackQuery, state: FSMContext) -> Non
     
     except Exception as e:
         logger.exception(f"Error publishing post for user {user.id}: {e}")
-        from html import escape
         error_text = escape(str(e)[:200])  # Limit and escape error text
         await callback.message.edit_text(
             "❌ <b>Произошла ошибка</b>\n\n"
@@ -813,7 +738,6 @@ async def save_as_draft(callback: CallbackQuery, state: FSMContext) -> None:
     
     except Exception as e:
         logger.exception(f"Error saving draft for user {user.id}: {e}")
-        from html import escape
         error_text = escape(str(e)[:200])
         await callback.message.edit_text(
             "❌ <b>Произошла ошибка при сохранении</b>\n\n"
@@ -1,13 +1,13 @@
 """Date/time parser for scheduling posts."""
 
 import logging
+import re
 from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
 from typing import Optional, Tuple
 from zoneinfo import ZoneInfo
 
-from dateutil import parser as dateutil_parser
-
-from app.config import get_settings
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +18,18 @@ RUSSIAN_DAYS = {
     "послезавтра": 2,
 }
 
+# One anchored match for the day prefix instead of a startswith per day name
+_DAY_RE = re.compile(r"^(" + "|".join(map(re.escape, RUSSIAN_DAYS)) + r")\s*")
+
 
+@lru_cache(maxsize=1)
 def get_timezone() -> ZoneInfo:
-    """Get timezone from settings using built-in zoneinfo."""
-    settings = get_settings()
+    """
+    Get timezone from settings using built-in zoneinfo.
+    
+    Settings don't change at runtime, so the zone is resolved once;
+    call get_timezone.cache_clear() after changing settings.tz.
+    """
     try:
         return ZoneInfo(settings.tz)
     except Exception:
@@ -61,11 +69,10 @@ def parse_datetime(text: str) -> Tuple[Optional[datetime], Optional[str]]:
         target_date = now.date()
         time_part = text
         
-        for day_name, day_offset in RUSSIAN_DAYS.items():
-            if text.startswith(day_name):
-                target_date = now.date() + timedelta(days=day_offset)
-                time_part = text[len(day_name):].strip()
-                break
+        day_match = _DAY_RE.match(text)
+        if day_match:
+            target_date = now.date() + timedelta(days=RUSSIAN_DAYS[day_match.group(1)])
+            time_part = text[day_match.end():]
         
         # Try to parse time (HH:MM format)
         if ":" in time_part and len(time_part.split()) == 1:
@@ -86,7 +93,9 @@ def parse_datetime(text: str) -> Tuple[Optional[datetime], Optional[str]]:
                 
                 return result, None
             except ValueError:
-                pass
+                # A bad "HH:MM" won't parse any other way, so skip dateutil
+                if time_part.count(":") == 1 and time_part.replace(":", "").isdigit():
+                    raise
         
         # Try to parse date + time (DD.MM HH:MM or DD.MM.YYYY HH:MM)
         parts = time_part.split()
@@ -107,7 +116,10 @@ def parse_datetime(text: str) -> Tuple[Optional[datetime], Optional[str]]:
                 
                 return result, None
         
-        # Fallback to dateutil parser
+        # Fallback to dateutil parser, imported on first use since most
+        # input is handled by the branches above
+        from dateutil import parser as dateutil_parser
+        
         parsed = dateutil_parser.parse(text, dayfirst=True)
         if parsed.tzinfo is None:
             parsed = parsed.replace(tzinfo=tz)
@@ -1,15 +1,32 @@
 """Permissions checking service."""
 
 import logging
+import time
 from typing import Optional, Tuple
 
-from aiogram.types import ChatMemberAdministrator, ChatMemberOwner
+from aiogram.types import ChatFullInfo, ChatMemberAdministrator, ChatMemberOwner
 
 from app.bot import bot
-from app.config import get_settings
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Channel metadata rarely changes, so get_chat results are reused briefly
+CHANNEL_CHAT_TTL = 60.0
+_channel_chat: Optional[Tuple[float, ChatFullInfo]] = None
+
+
+async def get_channel_chat() -> ChatFullInfo:
+    """Get the target channel via get_chat, cached for CHANNEL_CHAT_TTL seconds."""
+    global _channel_chat
+    now = time.monotonic()
+    if _channel_chat is not None and now - _channel_chat[0] < CHANNEL_CHAT_TTL:
+        return _channel_chat[1]
+    
+    chat = await bot.get_chat(settings.channel_id)
+    _channel_chat = (now, chat)
+    return chat
+
 
 async def check_bot_channel_permissions() -> Tuple[bool, Optional[str]]:
     """
@@ -18,11 +35,10 @@ async def check_bot_channel_permissions() -> Tuple[bool, Optional[str]]:
     Returns:
         Tuple of (has_permissions, error_message)
     """
-    settings = get_settings()
     channel_id = settings.channel_id
     
     try:
-        bot_info = await bot.get_me()
+        bot_info = await bot.me()
         member = await bot.get_chat_member(channel_id, bot_info.id)
         
         if not isinstance(member, (ChatMemberAdministrator, ChatMemberOwner)):
@@ -43,16 +59,13 @@ async def check_bot_channel_permissions() -> Tuple[bool, Optional[str]]:
 
 async def check_user_is_admin(user_id: int) -> bool:
     """Check if user ID is in admin list."""
-    settings = get_settings()
     return user_id in settings.admin_ids
 
 
 async def get_channel_info() -> Optional[dict]:
     """Get channel information."""
-    settings = get_settings()
-    
     try:
-        chat = await bot.get_chat(settings.channel_id)
+        chat = await get_channel_chat()
         return {
             "id": chat.id,
             "title": chat.title,
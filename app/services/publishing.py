@@ -1,7 +1,8 @@
 """Publishing service for sending posts to channel."""
 
+import asyncio
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from aiogram.types import (
@@ -16,29 +17,23 @@ from aiogram.types import (
 )
 
 from app.bot import bot
-from app.config import get_settings
-from app.db.models import DraftPost, DraftButton, DraftMedia, MediaType, PostStatus
+from app.config import settings
+from app.db.models import DraftPost, DraftButton, DraftMedia, MediaType
 from app.db.repo import DraftPostRepository
 from app.db.session import get_session
 
 logger = logging.getLogger(__name__)
 
+# Max posts sent to Telegram at the same time when publishing a batch
+PUBLISH_CONCURRENCY = 20
+
 
 def list_to_entities(data: Optional[List[dict]]) -> Optional[List[MessageEntity]]:
     """Convert serialized list back to MessageEntity objects."""
     if not data:
         return None
-    result = []
-    for item in data:
-        result.append(MessageEntity(
-            type=item["type"],
-            offset=item["offset"],
-            length=item["length"],
-            url=item.get("url"),
-            language=item.get("language"),
-            custom_emoji_id=item.get("custom_emoji_id"),
-        ))
-    return result
+    # Validating the stored dicts as a whole also restores text_mention users
+    return [MessageEntity.model_validate(item) for item in data]
 
 
 def build_keyboard(buttons: List[DraftButton]) -> Optional[InlineKeyboardMarkup]:
@@ -91,13 +86,12 @@ async def publish_post(post: DraftPost) -> Optional[int]:
     Returns:
         Message ID of the published message, or None if failed
     """
-    settings = get_settings()
     channel_id = settings.channel_id
     
-    keyboard = build_keyboard(list(post.buttons))
-    entities = list_to_entities(post.text_entities)
-    
     try:
+        keyboard = build_keyboard(list(post.buttons))
+        entities = list_to_entities(post.text_entities)
+        
         # Case 1: No media, text only
         if not post.media:
             message = await bot.send_message(
@@ -166,25 +160,76 @@ async def publish_scheduled_post(post_id: int) -> None:
     
     async with get_session() as session:
         repo = DraftPostRepository(session)
-        post = await repo.get_by_id(post_id)
-        
-        if not post:
-            logger.error(f"Post {post_id} not found")
-            return
-        
-        if post.status != PostStatus.SCHEDULED.value:
-            logger.warning(f"Post {post_id} is not in scheduled status")
-            return
-        
+        posts = await repo.claim_due_for_publishing(datetime.now(timezone.utc), post_id=post_id)
+    
+    if not posts:
+        # Deleted, rescheduled, or already claimed by the due posts poller
+        logger.info(f"Post {post_id} is no longer due in scheduled status")
+        return
+    
+    await _publish_and_record(posts[0])
+
+
+async def _publish_and_record(post: DraftPost) -> None:
+    """Publish a claimed post and record the result in its own transaction."""
+    try:
         message_id = await publish_post(post)
+        async with get_session() as session:
+            repo = DraftPostRepository(session)
+            if message_id:
+                await repo.mark_published(
+                    post_id=post.id,
+                    message_id=message_id,
+                    published_at=datetime.now(timezone.utc),
+                )
+                logger.info(f"Post {post.id} published successfully, message_id={message_id}")
+                return
+            await repo.mark_failed(post.id)
+        logger.error(f"Post {post.id} publication failed")
+    except Exception:
+        # Never leave a claimed post stuck in PUBLISHING
+        logger.exception(f"Failed to publish post {post.id}")
+        async with get_session() as session:
+            await DraftPostRepository(session).mark_failed(post.id)
+
+
+async def publish_due_posts(misfire_grace_time: timedelta) -> int:
+    """
+    Claim due scheduled posts and publish them concurrently.
+    
+    Picks up posts whose own job didn't run, as long as they were due at
+    most ``misfire_grace_time`` ago; older ones are left alone, like the
+    scheduler drops their misfired jobs. Each post's result is recorded
+    as soon as its send finishes, so one failure doesn't leave the rest
+    of the batch unrecorded.
+    
+    Args:
+        misfire_grace_time: How late a post may still be published
         
-        if message_id:
-            await repo.mark_published(
-                post_id=post_id,
-                message_id=message_id,
-                published_at=datetime.now(timezone.utc),
-            )
-            logger.info(f"Post {post_id} published successfully, message_id={message_id}")
-        else:
-            await repo.mark_failed(post_id)
-            logger.error(f"Post {post_id} publication failed")
+    Returns:
+        Number of posts claimed for publishing
+    """
+    now = datetime.now(timezone.utc)
+    async with get_session() as session:
+        repo = DraftPostRepository(session)
+        posts = await repo.claim_due_for_publishing(now, not_before=now - misfire_grace_time)
+    
+    if not posts:
+        return 0
+    
+    semaphore = asyncio.Semaphore(PUBLISH_CONCURRENCY)
+    
+    async def _publish(post: DraftPost) -> None:
+        async with semaphore:
+            await _publish_and_record(post)
+    
+    results = await asyncio.gather(
+        *(_publish(post) for post in posts), return_exceptions=True
+    )
+    for post, result in zip(posts, results):
+        if isinstance(result, Exception):
+            # Recording the failure failed too; fail_stale_publishing
+            # releases the post on the next startup
+            logger.error(f"Could not record result for post {post.id}: {result}")
+    
+    return len(posts)
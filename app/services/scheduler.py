@@ -1,38 +1,71 @@
 """APScheduler integration for scheduled posts."""
 
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
-from app.config import get_settings
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler: Optional[AsyncIOScheduler] = None
 
+# How late a post may still be published after its scheduled time
+MISFIRE_GRACE_TIME = timedelta(minutes=5)
+
+# How often due posts whose own job didn't run are picked up in a batch
+DUE_POSTS_POLL_INTERVAL = timedelta(minutes=1)
+
+# Posts left PUBLISHING for longer than this were abandoned mid-send
+STALE_PUBLISHING_AFTER = timedelta(minutes=10)
+
+# How often abandoned PUBLISHING posts are looked for while running
+STALE_PUBLISHING_CHECK_INTERVAL = timedelta(minutes=1)
+
 
 async def start_scheduler() -> None:
     """Initialize and start the APScheduler."""
     global scheduler
     
-    settings = get_settings()
-    
     scheduler = AsyncIOScheduler(
         timezone=settings.tz,
         job_defaults={
             "coalesce": True,
             "max_instances": 1,
-            "misfire_grace_time": 60 * 5,  # 5 minutes
+            "misfire_grace_time": int(MISFIRE_GRACE_TIME.total_seconds()),
         },
     )
     
+    # Release posts a previous run claimed but never finished publishing,
+    # now and then periodically, so a quick restart doesn't leave them stuck
+    await fail_stale_publishing()
+    scheduler.add_job(
+        fail_stale_publishing,
+        trigger=IntervalTrigger(seconds=STALE_PUBLISHING_CHECK_INTERVAL.total_seconds()),
+        id="fail_stale_publishing",
+        replace_existing=True,
+    )
+    
     # Restore scheduled jobs from database
     await restore_scheduled_jobs()
     
+    # Publish due posts whose own job was lost together, within the same
+    # grace time the jobs get
+    from app.services.publishing import publish_due_posts
+    
+    scheduler.add_job(
+        publish_due_posts,
+        trigger=IntervalTrigger(seconds=DUE_POSTS_POLL_INTERVAL.total_seconds()),
+        id="publish_due_posts",
+        args=[MISFIRE_GRACE_TIME],
+        replace_existing=True,
+    )
+    
     scheduler.start()
     logger.info(f"Scheduler started with timezone: {settings.tz}")
 
@@ -46,6 +79,24 @@ async def shutdown_scheduler() -> None:
         logger.info("Scheduler stopped")
 
 
+async def fail_stale_publishing() -> None:
+    """Mark posts stuck in PUBLISHING after a crash or shutdown as failed."""
+    try:
+        from app.db.session import get_session
+        from app.db.repo import DraftPostRepository
+        
+        async with get_session() as session:
+            repo = DraftPostRepository(session)
+            post_ids = await repo.fail_stale_publishing(
+                datetime.now(timezone.utc) - STALE_PUBLISHING_AFTER
+            )
+        
+        if post_ids:
+            logger.warning(f"Marked {len(post_ids)} stuck publishing posts as failed: {post_ids}")
+    except Exception as e:
+        logger.error(f"Failed to release stuck publishing posts: {e}")
+
+
 async def restore_scheduled_jobs() -> None:
     """Restore scheduled jobs from database after restart."""
     logger.info("Restoring scheduled jobs from database...")
@@ -3,9 +3,32 @@
 import re
 from typing import List, Optional, Tuple
 
+from aiogram import F
 from aiogram.types import Message
 
 
+# Separators between button text and URL, in order of precedence
+_BUTTON_SEPARATORS = (" - ", " | ", " — ")
+
+# Every valid button line has a separator followed by a URL; input without
+# one is rejected before splitting it into lines
+_BUTTON_HINT_RE = re.compile(
+    "(?:" + "|".join(map(re.escape, _BUTTON_SEPARATORS)) + r")\s*https?://",
+    re.IGNORECASE
+)
+
+# URL accepted for inline buttons, compiled once for every parsed button
+_URL_RE = re.compile(
+    r"^https?://"  # http:// or https://
+    r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|"  # domain
+    r"localhost|"  # localhost
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # IP
+    r"(?::\d+)?"  # optional port
+    r"(?:/?|[/?]\S+)$",
+    re.IGNORECASE
+)
+
+
 def escape_html(text: str) -> str:
     """Escape HTML special characters for Telegram."""
     return (
@@ -36,42 +59,43 @@ def parse_button_text(text: str) -> List[Tuple[str, str]]:
     Returns:
         List of (text, url) tuples
     """
+    if not _BUTTON_HINT_RE.search(text):
+        return []
+    
     buttons = []
-    lines = text.strip().split("\n")
     
-    for line in lines:
+    for line in text.strip().split("\n"):
         line = line.strip()
         if not line:
             continue
         
-        # Try different separators
-        for separator in [" - ", " | ", " — "]:
-            if separator in line:
-                parts = line.split(separator, 1)
-                if len(parts) == 2:
-                    btn_text = parts[0].strip()
-                    btn_url = parts[1].strip()
-                    
-                    # Validate URL
-                    if is_valid_url(btn_url):
-                        buttons.append((btn_text, btn_url))
+        # Try different separators; the first one present wins
+        for separator in _BUTTON_SEPARATORS:
+            btn_text, found, btn_url = line.partition(separator)
+            if found:
+                btn_url = btn_url.strip()
+                
+                # Validate URL
+                if _URL_RE.match(btn_url):
+                    buttons.append((btn_text.strip(), btn_url))
                 break
     
     return buttons
 
 
+def post_id_filter(prefix: str):
+    """Filter for ``<prefix><post_id>`` callbacks, exposing the match as ``match``."""
+    return F.data.regexp(re.compile(rf"^{prefix}(\d+)$")).as_("match")
+
+
+def button_id_filter(prefix: str):
+    """Filter for ``<prefix><post_id>_<button_id>`` callbacks, exposing ``match``."""
+    return F.data.regexp(re.compile(rf"^{prefix}(\d+)_(\d+)$")).as_("match")
+
+
 def is_valid_url(url: str) -> bool:
     """Check if string is a valid URL for Telegram buttons."""
-    url_pattern = re.compile(
-        r"^https?://"  # http:// or https://
-        r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|"  # domain
-        r"localhost|"  # localhost
-        r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # IP
-        r"(?::\d+)?"  # optional port
-        r"(?:/?|[/?]\S+)$",
-        re.IGNORECASE
-    )
-    return bool(url_pattern.match(url))
+    return bool(_URL_RE.match(url))
 
 
 def extract_message_text(message: Message) -> Optional[str]:
@@ -0,0 +1,33 @@
+"""Composite index on draft_posts (status, scheduled_at).
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_draft_posts_status_scheduled_at',
+        'draft_posts',
+        ['status', 'scheduled_at'],
+    )
+    # Covered by the composite index above
+    op.drop_index('ix_draft_posts_status', table_name='draft_posts')
+    op.drop_index('ix_draft_posts_scheduled_at', table_name='draft_posts')
+
+
+def downgrade() -> None:
+    op.create_index('ix_draft_posts_scheduled_at', 'draft_posts', ['scheduled_at'])
+    op.create_index('ix_draft_posts_status', 'draft_posts', ['status'])
+    op.drop_index('ix_draft_posts_status_scheduled_at', table_name='draft_posts')
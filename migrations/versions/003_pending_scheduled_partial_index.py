@@ -0,0 +1,29 @@
+"""Partial index on scheduled_at for pending scheduled posts.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_draft_posts_pending_sched',
+        'draft_posts',
+        ['scheduled_at'],
+        postgresql_where=sa.text("status = 'scheduled'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_draft_posts_pending_sched', table_name='draft_posts')
@@ -0,0 +1,31 @@
+"""Composite index on draft_posts (author_id, status, created_at).
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_draft_posts_author_status_created',
+        'draft_posts',
+        ['author_id', 'status', 'created_at'],
+    )
+    # Covered by the composite index above
+    op.drop_index('ix_draft_posts_author_id', table_name='draft_posts')
+
+
+def downgrade() -> None:
+    op.create_index('ix_draft_posts_author_id', 'draft_posts', ['author_id'])
+    op.drop_index('ix_draft_posts_author_status_created', table_name='draft_posts')
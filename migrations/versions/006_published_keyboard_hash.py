@@ -0,0 +1,27 @@
+"""Add draft_posts.published_keyboard_hash.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'draft_posts',
+        sa.Column('published_keyboard_hash', sa.String(length=32), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('draft_posts', 'published_keyboard_hash')
@@ -5,11 +5,19 @@ from typing import Generator
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import BigInteger
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 
 from app.db.base import Base
 
 
+@compiles(BigInteger, "sqlite")
+def _compile_big_integer_sqlite(type_, compiler, **kw) -> str:
+    """SQLite only autoincrements INTEGER PRIMARY KEY columns."""
+    return "INTEGER"
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
     """Create event loop for async tests."""
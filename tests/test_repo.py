@@ -1,10 +1,20 @@
 """Tests for draft post repository."""
 
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db import repo as repo_module
 from app.db.models import PostStatus
-from app.db.repo import DraftPostRepository
+from app.db.repo import (
+    DraftButtonRepository,
+    DraftPostRepository,
+    create_post_with_relations,
+    enable_list_cache,
+    enable_post_cache,
+)
 
 
 @pytest.mark.asyncio
@@ -48,3 +58,323 @@ async def test_get_nonexistent_post(db_session: AsyncSession):
     result = await repo.get_by_id(999999)
     
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_if_visible(db_session: AsyncSession):
+    """Test only the author or an admin can get a post."""
+    repo = DraftPostRepository(db_session)
+
+    created = await repo.create(author_id=123, text="Test")
+    await db_session.commit()
+
+    visible = await repo.get_by_id_if_visible(created.id, 123)
+    assert visible.id == created.id
+    statements = []
+    event.listen(
+        db_session.bind.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    assert await repo.get_by_id(created.id) is visible
+    assert statements == []
+    assert await repo.get_by_id_if_visible(created.id, 456) is None
+    assert (await repo.get_by_id_if_visible(created.id, 456, is_admin=True)).id == created.id
+
+
+@pytest.mark.asyncio
+async def test_create_post_with_relations(db_session: AsyncSession):
+    """Test creating a post with media and buttons in one go."""
+    post = await create_post_with_relations(
+        db_session,
+        author_id=123,
+        text="Album",
+        media_items=[
+            {"file_id": "f1", "media_type": "photo"},
+            {"file_id": "f2", "file_unique_id": "u2", "media_type": "video"},
+        ],
+        buttons=[("Site", "https://example.com"), ("Chat", "https://t.me/chat")],
+    )
+    
+    assert [m.file_id for m in post.media] == ["f1", "f2"]
+    assert [m.position for m in post.media] == [0, 1]
+    assert post.media[0].file_unique_id == "f1"
+    assert [b.text for b in post.buttons] == ["Site", "Chat"]
+    assert [b.row for b in post.buttons] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_update_returns_refreshed_post(db_session: AsyncSession):
+    """Test update returns the post with new values."""
+    repo = DraftPostRepository(db_session)
+    post = await create_post_with_relations(
+        db_session,
+        author_id=123,
+        text="Old",
+        buttons=[("Site", "https://example.com")],
+    )
+    statements = []
+    event.listen(
+        db_session.bind.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    
+    updated = await repo.update(post.id, text="New")
+    
+    assert len(statements) == 1
+    assert updated is post
+    assert updated.text == "New"
+    assert [b.text for b in updated.buttons] == ["Site"]
+    assert await repo.update(999999, text="Nope") is None
+    
+    db_session.expunge_all()
+    assert [b.text for b in (await repo.update(post.id, text="Newer")).buttons] == ["Site"]
+
+
+@pytest.mark.asyncio
+async def test_update_button(db_session: AsyncSession):
+    """Test updating a button returns the new values."""
+    post = await create_post_with_relations(
+        db_session,
+        author_id=123,
+        buttons=[("Site", "https://example.com")],
+    )
+    btn_repo = DraftButtonRepository(db_session)
+    
+    button = await btn_repo.update_button(post.buttons[0].id, url="https://new.example.com")
+    
+    assert button.url == "https://new.example.com"
+    assert button.text == "Site"
+
+
+@pytest.mark.asyncio
+async def test_mark_published(db_session: AsyncSession):
+    """Test marking a post as published returns its ID."""
+    repo = DraftPostRepository(db_session)
+    post = await repo.create(author_id=123, text="Test")
+    
+    result = await repo.mark_published(post.id, message_id=42, published_at=datetime.now(timezone.utc))
+    
+    assert result == post.id
+    
+    db_session.expunge_all()
+    published = await repo.get_by_id(result)
+    assert published.status == PostStatus.PUBLISHED.value
+    assert published.published_message_id == 42
+    assert await repo.mark_failed(999999) is None
+
+
+@pytest.mark.asyncio
+async def test_page_by_author_loads_list_fields_only(db_session: AsyncSession):
+    """Test list queries defer columns not shown in the list."""
+    repo = DraftPostRepository(db_session)
+    await repo.create(author_id=123, text="Test", text_entities=[{"type": "bold"}])
+    await db_session.commit()
+    db_session.expunge_all()
+    
+    posts, _ = await repo.page_by_author(123)
+    
+    assert len(posts) == 1
+    assert posts[0].text == "Test"
+    assert "text_entities" not in posts[0].__dict__
+
+
+@pytest.mark.asyncio
+async def test_page_by_author_pages(db_session: AsyncSession):
+    """Test list pages and counts are computed in SQL."""
+    repo = DraftPostRepository(db_session)
+    for i in range(5):
+        await repo.create(author_id=123, text=f"Post {i}")
+    await repo.create(author_id=123, text="Scheduled", status=PostStatus.SCHEDULED)
+    await repo.create(author_id=456, text="Other")
+    await db_session.commit()
+    
+    first, total = await repo.page_by_author(123, limit=4)
+    second, _ = await repo.page_by_author(123, limit=4, offset=4)
+    
+    assert len(first) == 4
+    assert len(second) == 2
+    assert not {p.id for p in first} & {p.id for p in second}
+    assert total == 6
+    assert (await repo.page_by_author(123, status=PostStatus.SCHEDULED))[1] == 1
+    assert (await repo.page_all())[1] == 7
+
+
+@pytest.mark.asyncio
+async def test_page_by_author(db_session: AsyncSession):
+    """Test a page and the total count come back from one query."""
+    repo = DraftPostRepository(db_session)
+    for i in range(3):
+        await repo.create(author_id=123, text=f"Post {i}")
+    await repo.create(author_id=456, text="Other")
+    await db_session.commit()
+    
+    posts, total = await repo.page_by_author(123, limit=2)
+    assert [p.text for p in posts] == ["Post 2", "Post 1"]
+    assert total == 3
+    
+    posts, total = await repo.page_by_author(123, limit=2, offset=4)
+    assert posts == [] and total == 3
+    
+    posts, total = await repo.page_all(status=PostStatus.SCHEDULED)
+    assert posts == [] and total == 0
+
+
+@pytest.mark.asyncio
+async def test_page_by_author_cursor(db_session: AsyncSession):
+    """Test seeking pages from the edge post in both directions."""
+    repo = DraftPostRepository(db_session)
+    for i in range(5):
+        await repo.create(author_id=123, text=f"Post {i}")
+    await db_session.commit()
+
+    first, _ = await repo.page_by_author(123, limit=2)
+    second, total = await repo.page_by_author(123, limit=2, after_id=first[-1].id)
+    assert [p.text for p in second] == ["Post 2", "Post 1"]
+    assert total == 5
+
+    back, total = await repo.page_by_author(123, limit=2, before_id=second[0].id)
+    assert [p.id for p in back] == [p.id for p in first]
+    assert total == 5
+
+
+@pytest.mark.asyncio
+async def test_claim_due_for_publishing(db_session: AsyncSession):
+    """Test due scheduled posts are claimed once."""
+    repo = DraftPostRepository(db_session)
+    now = datetime.now(timezone.utc)
+    due = await create_post_with_relations(
+        db_session,
+        author_id=123,
+        buttons=[("Site", "https://example.com")],
+        scheduled_at=now - timedelta(minutes=1),
+        status=PostStatus.SCHEDULED,
+    )
+    await repo.create(author_id=123, scheduled_at=now + timedelta(hours=1), status=PostStatus.SCHEDULED)
+    await repo.create(author_id=123, text="Draft")
+    missed = await repo.create(
+        author_id=123, scheduled_at=now - timedelta(hours=2), status=PostStatus.SCHEDULED
+    )
+    await db_session.commit()
+    db_session.expunge_all()
+    
+    assert await repo.claim_due_for_publishing(
+        now, post_id=missed.id, not_before=now - timedelta(hours=1)
+    ) == []
+    claimed = await repo.claim_due_for_publishing(now, post_id=due.id)
+    
+    assert [p.id for p in claimed] == [due.id]
+    assert claimed[0].status == PostStatus.PUBLISHING.value
+    assert [b.text for b in claimed[0].buttons] == ["Site"]
+    assert await repo.claim_due_for_publishing(now, not_before=now - timedelta(hours=1)) == []
+    assert [p.id for p in await repo.claim_due_for_publishing(now)] == [missed.id]
+
+
+@pytest.mark.asyncio
+async def test_claim_for_publishing(db_session: AsyncSession):
+    """Test a post is claimed and marked published only once."""
+    repo = DraftPostRepository(db_session)
+    post_id = (await repo.create(author_id=123, text="Draft")).id
+    await db_session.commit()
+
+    claimed = await repo.claim_for_publishing(post_id)
+    assert claimed.status == PostStatus.PUBLISHING.value
+    assert await repo.claim_for_publishing(post_id) is None
+
+    now = datetime.now(timezone.utc)
+    assert await repo.mark_published(post_id, message_id=1, published_at=now) == post_id
+    assert await repo.mark_published(post_id, message_id=2, published_at=now) is None
+
+
+@pytest.mark.asyncio
+async def test_fail_stale_publishing(db_session: AsyncSession):
+    """Test only posts left publishing too long are marked failed."""
+    repo = DraftPostRepository(db_session)
+    post_id = (await repo.create(author_id=123, text="Draft")).id
+    await repo.create(author_id=123, text="Other")
+    await repo.claim_for_publishing(post_id)
+    await db_session.commit()
+
+    now = datetime.now(timezone.utc)
+    assert await repo.fail_stale_publishing(now - timedelta(minutes=10)) == []
+    assert await repo.fail_stale_publishing(now + timedelta(minutes=1)) == [post_id]
+    assert (await repo.get_by_id(post_id)).status == PostStatus.FAILED.value
+
+
+@pytest.mark.asyncio
+async def test_post_cache(db_session: AsyncSession, monkeypatch):
+    """Test cached get_by_id is invalidated by repository writes."""
+    monkeypatch.setattr(repo_module, "_post_cache", None)
+    enable_post_cache()
+    repo = DraftPostRepository(db_session)
+    post_id = (await repo.create(author_id=123, text="Old")).id
+    await db_session.commit()
+    db_session.expunge_all()
+    
+    cached = await repo.get_by_id(post_id)
+    assert await repo.get_by_id(post_id) is cached
+    
+    await repo.update(post_id, text="New")
+    db_session.expunge_all()
+    
+    assert (await repo.get_by_id(post_id)).text == "New"
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_session_memo(db_session: AsyncSession):
+    """Test get_by_id is memoized per session until the post's buttons change."""
+    repo = DraftPostRepository(db_session)
+    post_id = (await repo.create(author_id=123, text="Test")).id
+    await db_session.commit()
+
+    post = await repo.get_by_id(post_id)
+    assert await DraftPostRepository(db_session).get_by_id(post_id) is post
+    assert post.buttons == []
+
+    await DraftButtonRepository(db_session).add_button(post_id, "Site", "https://example.com")
+
+    assert [b.text for b in (await repo.get_by_id(post_id)).buttons] == ["Site"]
+
+
+@pytest.mark.asyncio
+async def test_list_cache(db_session: AsyncSession, monkeypatch):
+    """Test cached list pages are dropped when posts change."""
+    monkeypatch.setattr(repo_module, "_list_cache", None)
+    enable_list_cache()
+    repo = DraftPostRepository(db_session)
+    post = await repo.create(author_id=123, text="First")
+    await db_session.commit()
+    
+    page = await repo.page_by_author(123)
+    assert (await repo.page_by_author(123))[0] is page[0]
+    assert page[1] == 1
+    
+    await repo.create(author_id=123, text="Second")
+    await db_session.commit()
+    
+    assert (await repo.page_by_author(123))[1] == 2
+    await repo.delete(post.id)
+    assert len((await repo.page_by_author(123))[0]) == 1
+
+
+@pytest.mark.asyncio
+async def test_add_buttons_bulk(db_session: AsyncSession):
+    """Test bulk-adding buttons places each on its own row."""
+    repo = DraftPostRepository(db_session)
+    post = await repo.create(author_id=123)
+    btn_repo = DraftButtonRepository(db_session)
+    
+    buttons = await btn_repo.add_buttons_bulk(
+        post.id,
+        [("A", "https://a.example.com"), ("B", "https://b.example.com")],
+        start_row=2,
+    )
+    
+    assert [(b.text, b.row) for b in buttons] == [("A", 2), ("B", 3)]
+    assert await btn_repo.add_buttons_bulk(post.id, []) == []
+    assert (await btn_repo.get_by_id(buttons[1].id)).text == "B"
+    assert await btn_repo.next_row(post.id) == 4
+    assert await btn_repo.next_row(999999) is None
+    assert await btn_repo.next_row((await repo.create(author_id=123)).id) == 0
+    assert await btn_repo.get_by_id(999999) is None